@@ -0,0 +1,179 @@
+import argparse
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from random import Random
+from statistics import quantiles
+from time import perf_counter
+
+from compact_tree import CompactTree
+from main import GameNode
+from mcts import MCTSEngine
+from mnk import MNKEngine, MNKGame
+from node import GameState
+
+# A policy picks the next position from a position that is still in progress
+Policy = Callable[[GameNode, Random], GameNode]
+
+
+def perfect_policy() -> Policy:
+    def choose(node: GameNode, rng: Random) -> GameNode:
+        return rng.choice(node.get_best_moves())
+
+    return choose
+
+
+def random_policy() -> Policy:
+    def choose(node: GameNode, rng: Random) -> GameNode:
+        return rng.choice(node.children)
+
+    return choose
+
+
+def epsilon_greedy_policy(epsilon: float) -> Policy:
+    def choose(node: GameNode, rng: Random) -> GameNode:
+        if rng.random() < epsilon:
+            return rng.choice(node.children)
+        return rng.choice(node.get_best_moves())
+
+    return choose
+
+
+def depth_limited_policy(depth: int, game: MNKGame | None = None) -> Policy:
+    """Alpha-beta search that looks at most depth plies ahead."""
+    engine = MNKEngine(game or MNKGame(), time_limit=None, max_depth=depth)
+
+    def choose(node: GameNode, rng: Random) -> GameNode:
+        values = engine.analyze(node.side1, node.side2).move_values
+        pick = max if node.side_to_move == 1 else min
+        best_value = pick(values.values())
+        best_cells = [cell for cell, value in values.items() if value == best_value]
+        return node.child(rng.choice(best_cells))
+
+    return choose
+
+
+def mcts_policy(
+    playouts: int = 1000, time_limit: float | None = None, game: MNKGame | None = None
+) -> Policy:
+    """Monte Carlo tree search, reusing its tree between moves of a game."""
+    engine = MCTSEngine(game or MNKGame(), time_limit, playouts)
+
+    def choose(node: GameNode, rng: Random) -> GameNode:
+        # Share the arena's generator so seeded runs repeat
+        engine.rng = rng
+        cells = engine.analyze(node.side1, node.side2).best_moves()
+        return node.child(rng.choice(cells))
+
+    return choose
+
+
+POLICIES: dict[str, Callable[[], Policy]] = {
+    "perfect": perfect_policy,
+    "random": random_policy,
+    "epsilon": lambda: epsilon_greedy_policy(0.1),
+    "depth2": lambda: depth_limited_policy(2),
+    "mcts": mcts_policy,
+}
+
+
+@dataclass
+class ArenaReport:
+    games: int = 0
+    elapsed: float = 0.0
+    # Per-move decision times in seconds
+    latencies: list[float] = field(default_factory=list)
+    # "player1", "player2" or "draw", counted per game
+    outcomes: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def games_per_second(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def latency_percentiles(self) -> dict[str, float]:
+        if len(self.latencies) < 2:
+            return {}
+        cuts = quantiles(self.latencies, n=100)
+        return {
+            "p50": cuts[49],
+            "p90": cuts[89],
+            "p99": cuts[98],
+            "max": max(self.latencies),
+        }
+
+    def summary(self) -> str:
+        lines = [
+            f"Games: {self.games} in {self.elapsed:.3f}s "
+            f"({self.games_per_second:,.0f} games/sec)",
+            "Outcomes: "
+            + ", ".join(
+                f"{outcome} {self.outcomes[outcome]}"
+                for outcome in ("player1", "player2", "draw")
+            ),
+        ]
+        percentiles = self.latency_percentiles()
+        if percentiles:
+            lines.append(
+                "Move latency: "
+                + ", ".join(
+                    f"{name} {seconds * 1e6:.1f}µs"
+                    for name, seconds in percentiles.items()
+                )
+            )
+        return "\n".join(lines)
+
+
+def play_game(
+    root: GameNode, first: Policy, second: Policy, rng: Random, latencies: list[float]
+) -> GameState:
+    """Play one game from root and return its final state."""
+    node = root
+    while node.state == GameState.IN_PROGRESS:
+        policy = first if node.side_to_move == 1 else second
+        start = perf_counter()
+        node = policy(node, rng)
+        latencies.append(perf_counter() - start)
+    return node.state
+
+
+def run_arena(
+    root: GameNode,
+    player1: Policy,
+    player2: Policy,
+    games: int,
+    seed: int | None = None,
+) -> ArenaReport:
+    """Play games between two policies, alternating who moves first."""
+    rng = Random(seed)
+    report = ArenaReport()
+    start = perf_counter()
+    for game in range(games):
+        player1_first = game % 2 == 0
+        first, second = (player1, player2) if player1_first else (player2, player1)
+        state = play_game(root, first, second, rng, report.latencies)
+        if state == GameState.DRAW:
+            report.outcomes["draw"] += 1
+        elif (state == GameState.SIDE1_WIN) == player1_first:
+            report.outcomes["player1"] += 1
+        else:
+            report.outcomes["player2"] += 1
+    report.elapsed = perf_counter() - start
+    report.games = games
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play policies against each other")
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--player1", choices=POLICIES, default="perfect")
+    parser.add_argument("--player2", choices=POLICIES, default="random")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    report = run_arena(
+        CompactTree.build().root,
+        POLICIES[args.player1](),
+        POLICIES[args.player2](),
+        args.games,
+        args.seed,
+    )
+    print(report.summary())
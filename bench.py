@@ -0,0 +1,228 @@
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+import main
+from instrumentation import STATS
+from mnk import MNKGame
+from node import Node, canonical_key
+from retrograde import retrograde_solve
+
+# Positions from every stage of the game for the win-check benchmark
+SAMPLE_POSITIONS = (
+    ((0, 0, 0), (0, 0, 0), (0, 0, 0)),
+    ((1, 0, 0), (0, 2, 0), (0, 0, 0)),
+    ((1, 2, 1), (0, 2, 0), (0, 1, 0)),
+    ((1, 1, 1), (0, 2, 0), (0, 0, 2)),
+    ((1, 2, 1), (1, 2, 2), (2, 1, 1)),
+)
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Fastest of repeat runs, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def expand_tree() -> Node:
+    Node.nodes.clear()
+    root = Node.from_bits(side_to_move=1, side1=0, side2=0)
+    Node.nodes[canonical_key(0, 0)] = root
+    root.create_children_recursively()
+    return root
+
+
+def solve_tree(root: Node) -> None:
+    for node in Node.nodes.values():
+        node.minimax_value = None
+    root.set_minimax_recursively()
+
+
+def transposition_lookups(game: MNKGame, repeat: int) -> dict[str, float]:
+    """Per-move cost of keying a table by tuple positions, bitboards or Zobrist.
+
+    Each scheme derives the key of every position along random games the way a
+    search would, then looks it up in a table holding all of them.
+    """
+    rng = Random(0)
+    games = []
+    for _ in range(200):
+        moves = list(range(game.cells))
+        rng.shuffle(moves)
+        games.append(moves)
+    plies = sum(len(moves) for moves in games)
+
+    def tuple_keys() -> list:
+        keys = []
+        for moves in games:
+            side1 = side2 = 0
+            for ply, cell in enumerate(moves):
+                if ply % 2:
+                    side2 |= 1 << cell
+                else:
+                    side1 |= 1 << cell
+                keys.append(game.to_position(side1, side2))
+        return keys
+
+    def bitboard_keys() -> list:
+        # MNKEngine keys positions from the mover's side: (mine, theirs)
+        keys = []
+        for moves in games:
+            mine = theirs = 0
+            for cell in moves:
+                mine, theirs = theirs, mine | 1 << cell
+                keys.append(mine | theirs << game.cells)
+        return keys
+
+    def zobrist_keys() -> list:
+        # The engine's update: zobrist hashes (mine, theirs) and swapped hashes
+        # (theirs, mine), so each move trades the two with one XOR each
+        keys = []
+        codes = game.zobrist
+        for moves in games:
+            zobrist = swapped = 0
+            for cell in moves:
+                zobrist, swapped = swapped ^ codes[1][cell], zobrist ^ codes[0][cell]
+                keys.append(zobrist)
+        return keys
+
+    timings = {}
+    for name, make_keys in (
+        ("tuple", tuple_keys),
+        ("bitboard", bitboard_keys),
+        ("zobrist", zobrist_keys),
+    ):
+        table = dict.fromkeys(make_keys())
+
+        def lookup_all() -> None:
+            for key in make_keys():
+                table[key]
+
+        label = f"{name}_key_lookup_{game.m}x{game.n}_per_call"
+        timings[label] = best_time(lookup_all, repeat) / plies
+    return timings
+
+
+def run_benchmarks(repeat: int = 5) -> dict:
+    timings: dict[str, float] = {}
+    timings["build_tree"] = best_time(main.build_tree, repeat)
+    timings["expand_tree"] = best_time(expand_tree, repeat)
+    root = expand_tree()
+    timings["solve_tree"] = best_time(lambda: solve_tree(root), repeat)
+    timings["retrograde_solve"] = best_time(retrograde_solve, repeat)
+
+    STATS.reset()
+    tracemalloc.start()
+    root = main.build_tree()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    counts = {
+        "stored_nodes": len(Node.nodes),
+        "minimax_visits": STATS.minimax_visits,
+    }
+
+    # Pass the directory explicitly so $TICTACTOE_CACHE_DIR's cache is never touched
+    with tempfile.TemporaryDirectory() as directory:
+        timings["cache_tree"] = best_time(
+            lambda: main.cache_tree(root, directory), repeat
+        )
+        timings["load_cached_tree"] = best_time(
+            lambda: main.load_cached_tree(directory=directory), repeat
+        )
+        counts["cache_bytes"] = (Path(directory) / main.CACHE_FILE).stat().st_size
+
+    # Every reachable in-progress position, so the per-call figure covers all stages
+    positions: list[Node] = []
+    seen: set[int] = set()
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        if node.key in seen:
+            continue
+        seen.add(node.key)
+        pending.extend(node.children)
+        if node.children:
+            positions.append(node)
+    counts["reachable_positions"] = len(seen)
+
+    def best_moves_for_all() -> None:
+        for node in positions:
+            node.get_best_moves()
+
+    elapsed = best_time(best_moves_for_all, repeat)
+    timings["get_best_moves_per_call"] = elapsed / len(positions)
+
+    calls = 10_000
+
+    def check_many() -> None:
+        for _ in range(calls // len(SAMPLE_POSITIONS)):
+            for position in SAMPLE_POSITIONS:
+                Node.check_winner_or_drawn(position)
+
+    timings["check_winner_or_drawn_per_call"] = best_time(check_many, repeat) / calls
+    for game in (MNKGame(), MNKGame(7, 7, 5)):
+        timings.update(transposition_lookups(game, repeat))
+    Node.nodes.clear()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timings": timings,
+        "memory": {"build_tree_peak_bytes": peak},
+        "counts": counts,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Metrics that are more than tolerance (a fraction) worse than the baseline."""
+    regressions = []
+    for section in ("timings", "memory"):
+        for name, value in results[section].items():
+            before = baseline.get(section, {}).get(name)
+            if before and value > before * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {value:.6g} vs baseline {before:.6g} "
+                    f"(+{(value / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the game tree hot paths")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write results as JSON here")
+    parser.add_argument(
+        "--compare", type=Path, help="Baseline JSON to check the results against"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown against the baseline as a fraction (default: 0.25)",
+    )
+    args = parser.parse_args()
+    results = run_benchmarks(args.repeat)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    print(text)
+    if args.compare:
+        regressions = compare(
+            results, json.loads(args.compare.read_text()), args.tolerance
+        )
+        if regressions:
+            print("\n❌ Regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(1)
+        print("\n✓ No regressions against baseline")
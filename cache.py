@@ -0,0 +1,91 @@
+import os
+import secrets
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, TypeVar
+
+T = TypeVar("T")
+
+# Directory for cache files when none is passed; defaults to the working directory
+CACHE_DIR_ENV = "TICTACTOE_CACHE_DIR"
+
+
+def cache_path(name: str, directory: str | os.PathLike | None = None) -> Path:
+    directory = Path(directory or os.environ.get(CACHE_DIR_ENV) or ".")
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / name
+
+
+def atomic_write(path: str | os.PathLike, write: Callable[[BinaryIO], object]) -> None:
+    """Write a file through a temporary sibling and rename it into place.
+
+    Readers see either the old file or the complete new one, never a partial
+    write, and a file another process has mapped is replaced rather than
+    truncated under it.
+    """
+    path = Path(path)
+    temp_name = path.parent / f".{path.name}.{secrets.token_hex(8)}"
+    # Mode 0o666 as open() uses, so the kernel applies the umask
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+    fd = os.open(temp_name, flags, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        os.unlink(temp_name)
+        raise
+
+
+@contextmanager
+def exclusive_lock(path: str | os.PathLike) -> Iterator[None]:
+    """Hold an exclusive lock on path + ".lock", waiting for other holders."""
+    with open(f"{os.fspath(path)}.lock", "a+b") as file:
+        if os.name == "nt":
+            import msvcrt
+
+            while True:
+                try:
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after ten seconds; keep waiting
+                    continue
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def load_or_build(
+    path: str | os.PathLike,
+    load: Callable[[bool], T | None],
+    build: Callable[[], T],
+) -> T:
+    """Load a cached value, or build it while holding the cache file's lock.
+
+    Processes that find the cache cold queue on the lock; the first one builds,
+    and the rest load what it wrote once they get the lock. load is called with
+    quiet=False first and quiet=True for the check under the lock, so a stale
+    cache is only reported once.
+    """
+    value = load(False)
+    if value is not None:
+        return value
+    with exclusive_lock(path):
+        value = load(True)
+        if value is None:
+            value = build()
+    return value
@@ -0,0 +1,246 @@
+import sys
+from array import array
+from collections.abc import Iterator
+
+from node import (
+    DRAW_SCORE,
+    FULL_BOARD,
+    WIN_SCORE,
+    GameState,
+    Node,
+    position_to_str,
+    state_of,
+    to_position,
+)
+
+STATES = tuple(GameState)
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+
+class CompactTree:
+    """Solved game tree held in flat buffers indexed by integer node ids.
+
+    Node ids are assigned breadth-first from the empty board, so every child has a
+    larger id than its parent. The children of node ``n`` are
+    ``child_ids[child_start[n]:child_start[n + 1]]``.
+    """
+
+    def __init__(self) -> None:
+        self.keys = array("I")
+        self.side_to_move = bytearray()
+        self.states = bytearray()
+        self.values = array("b")
+        self.child_start = array("I", [0])
+        self.child_ids = array("I")
+
+    @classmethod
+    def build(cls) -> "CompactTree":
+        tree = cls()
+        ids: dict[int, int] = {0: 0}
+        tree._append(0, 1)
+        node_id = 0
+        # Expand breadth-first; nodes are appended while they are being iterated
+        while node_id < len(tree.keys):
+            key = tree.keys[node_id]
+            if tree.states[node_id] == STATE_CODES[GameState.IN_PROGRESS]:
+                side1, side2 = key & FULL_BOARD, key >> 9
+                side = tree.side_to_move[node_id]
+                occupied = side1 | side2
+                for cell in range(9):
+                    if occupied >> cell & 1:
+                        continue
+                    if side == 1:
+                        child_key = key | 1 << cell
+                    else:
+                        child_key = key | 1 << (cell + 9)
+                    child_id = ids.get(child_key)
+                    if child_id is None:
+                        child_id = ids[child_key] = len(tree.keys)
+                        tree._append(child_key, 3 - side)
+                    tree.child_ids.append(child_id)
+            tree.child_start.append(len(tree.child_ids))
+            node_id += 1
+        tree._solve()
+        return tree
+
+    def _append(self, key: int, side_to_move: int) -> None:
+        self.keys.append(key)
+        self.side_to_move.append(side_to_move)
+        self.states.append(STATE_CODES[state_of(key & FULL_BOARD, key >> 9)])
+        self.values.append(0)
+
+    def _solve(self) -> None:
+        # Children always have larger ids, so one backward pass solves the tree
+        for node_id in range(len(self.keys) - 1, -1, -1):
+            state = STATES[self.states[node_id]]
+            depth = self.keys[node_id].bit_count()
+            if state == GameState.SIDE1_WIN:
+                self.values[node_id] = WIN_SCORE - depth
+            elif state == GameState.SIDE2_WIN:
+                self.values[node_id] = depth - WIN_SCORE
+            elif state == GameState.DRAW:
+                self.values[node_id] = DRAW_SCORE
+            else:
+                child_values = (
+                    self.values[child] for child in self.children_of(node_id)
+                )
+                if self.side_to_move[node_id] == 1:
+                    self.values[node_id] = max(child_values)
+                else:
+                    self.values[node_id] = min(child_values)
+
+    def children_of(self, node_id: int) -> array:
+        return self.child_ids[self.child_start[node_id] : self.child_start[node_id + 1]]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def root(self) -> "CompactNode":
+        return CompactNode(self, 0)
+
+    @property
+    def nbytes(self) -> int:
+        buffers = (
+            self.keys,
+            self.side_to_move,
+            self.states,
+            self.values,
+            self.child_start,
+            self.child_ids,
+        )
+        return sum(memoryview(buffer).nbytes for buffer in buffers)
+
+
+class CompactNode:
+    """Read-only ``Node``-like view of one position in a ``CompactTree``."""
+
+    __slots__ = ("tree", "node_id")
+
+    def __init__(self, tree: CompactTree, node_id: int) -> None:
+        self.tree = tree
+        self.node_id = node_id
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, CompactNode)
+            and self.tree is other.tree
+            and self.node_id == other.node_id
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.node_id))
+
+    @property
+    def key(self) -> int:
+        return self.tree.keys[self.node_id]
+
+    @property
+    def side1(self) -> int:
+        return self.key & FULL_BOARD
+
+    @property
+    def side2(self) -> int:
+        return self.key >> 9
+
+    @property
+    def position(self) -> tuple[tuple[int, ...], ...]:
+        return to_position(self.side1, self.side2)
+
+    @property
+    def side_to_move(self) -> int:
+        return self.tree.side_to_move[self.node_id]
+
+    @property
+    def state(self) -> GameState:
+        return STATES[self.tree.states[self.node_id]]
+
+    @property
+    def minimax_value(self) -> int:
+        return self.tree.values[self.node_id]
+
+    @property
+    def children(self) -> list["CompactNode"]:
+        return [
+            CompactNode(self.tree, child)
+            for child in self.tree.children_of(self.node_id)
+        ]
+
+    @property
+    def moves(self) -> dict[int, "CompactNode"]:
+        """Children keyed by the cell (0-8) played to reach them."""
+        keys = self.tree.keys
+        key = keys[self.node_id]
+        moves = {}
+        for child in self.tree.children_of(self.node_id):
+            changed = keys[child] ^ key
+            cell = ((changed | changed >> 9) & FULL_BOARD).bit_length() - 1
+            moves[cell] = CompactNode(self.tree, child)
+        return moves
+
+    def child(self, cell: int) -> "CompactNode":
+        keys = self.tree.keys
+        key = keys[self.node_id] | 1 << (cell if self.side_to_move == 1 else cell + 9)
+        for child in self.tree.children_of(self.node_id):
+            if keys[child] == key:
+                return CompactNode(self.tree, child)
+        raise KeyError(cell)
+
+    def to_str(self, starting_side: str) -> str:
+        return position_to_str(self.position, starting_side)
+
+    def get_best_moves(self) -> list["CompactNode"]:
+        values = self.tree.values
+        child_ids = self.tree.children_of(self.node_id)
+        if not child_ids:
+            return []
+        pick = max if self.side_to_move == 1 else min
+        best_value = pick(values[child] for child in child_ids)
+        return [
+            CompactNode(self.tree, child)
+            for child in child_ids
+            if values[child] == best_value
+        ]
+
+
+def iter_node_tree(root: Node) -> Iterator[Node]:
+    """Every distinct Node object reachable from root."""
+    seen: set[int] = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        if node._children is not None:
+            stack.extend(node._children)
+
+
+def node_tree_bytes(root: Node) -> int:
+    """Approximate memory held by a Node tree: objects, their dicts and child lists."""
+    total = 0
+    for node in iter_node_tree(root):
+        total += sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+        if node._children is not None:
+            total += sys.getsizeof(node._children)
+    return total
+
+
+def memory_report(root: Node, tree: CompactTree) -> str:
+    node_count = sum(1 for _ in iter_node_tree(root))
+    node_bytes = node_tree_bytes(root)
+    return "\n".join(
+        [
+            f"Node tree:    {node_count} objects, {node_bytes} bytes, "
+            f"{node_bytes / node_count:.1f} bytes/node",
+            f"Compact tree: {len(tree)} positions, {tree.nbytes} bytes, "
+            f"{tree.nbytes / len(tree):.1f} bytes/node",
+        ]
+    )
+
+
+if __name__ == "__main__":
+    from main import build_tree
+
+    print(memory_report(build_tree(), CompactTree.build()))
@@ -0,0 +1,25 @@
+import pytest
+
+from compact_tree import CompactTree
+from node import Node
+from tablebase import Tablebase, write_tablebase
+
+
+@pytest.fixture(autouse=True)
+def reset_nodes():
+    # Runs after the test even when it fails, so no test inherits stored nodes
+    yield
+    Node.nodes.clear()
+
+
+@pytest.fixture(scope="session")
+def tree() -> CompactTree:
+    return CompactTree.build()
+
+
+@pytest.fixture(scope="session")
+def tablebase(tmp_path_factory, tree):
+    path = tmp_path_factory.mktemp("tablebase") / "tablebase.bin"
+    write_tablebase(path, tree)
+    with Tablebase(path) as tablebase:
+        yield tablebase
@@ -0,0 +1,176 @@
+import argparse
+import json
+import sys
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+
+from cache import cache_path
+from node import GameState, state_of
+from tablebase import PositionTable, open_tablebase
+
+# A game log has one game per line: the cells played in order, numbered 1-9 as
+# in the game's prompt, separated by spaces or commas or written as one digit
+# string ("5 1 9", "5,1,9" and "519" are the same game). Blank lines and lines
+# starting with "#" are skipped.
+
+
+@dataclass
+class GameReport:
+    line: int
+    moves: list[int]
+    result: str | None = None
+    # Moves that were not among the best moves, by 1-based ply
+    mistakes: list[int] = field(default_factory=list)
+    # Mistakes that changed the game-theoretic result (a win or draw thrown away)
+    blunders: list[int] = field(default_factory=list)
+    # Value each player gave away compared with perfect play
+    points_lost: dict[int, int] = field(default_factory=lambda: {1: 0, 2: 0})
+    error: str | None = None
+
+    @property
+    def first_mistake(self) -> int | None:
+        return self.mistakes[0] if self.mistakes else None
+
+
+@dataclass
+class LogSummary:
+    games: int = 0
+    invalid: int = 0
+    moves: int = 0
+    mistakes: int = 0
+    blunders: int = 0
+    points_lost: dict[int, int] = field(default_factory=lambda: {1: 0, 2: 0})
+    results: Counter[str] = field(default_factory=Counter)
+    # How many games first went wrong at each ply
+    first_mistakes: Counter[int] = field(default_factory=Counter)
+
+    def add(self, report: GameReport) -> None:
+        # Only games graded to the end have a result
+        if report.error is not None or report.result is None:
+            self.invalid += 1
+            return
+        self.games += 1
+        self.moves += len(report.moves)
+        self.mistakes += len(report.mistakes)
+        self.blunders += len(report.blunders)
+        for side, points in report.points_lost.items():
+            self.points_lost[side] += points
+        self.results[report.result] += 1
+        if report.first_mistake is not None:
+            self.first_mistakes[report.first_mistake] += 1
+
+    @property
+    def blunders_per_move(self) -> float:
+        return self.blunders / self.moves if self.moves else 0.0
+
+    @property
+    def mistakes_per_move(self) -> float:
+        return self.mistakes / self.moves if self.moves else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "games": self.games,
+            "invalid": self.invalid,
+            "moves": self.moves,
+            "mistakes": self.mistakes,
+            "blunders": self.blunders,
+            "mistakes_per_move": self.mistakes_per_move,
+            "blunders_per_move": self.blunders_per_move,
+            "points_lost": self.points_lost,
+            "results": dict(self.results),
+            "first_mistakes": dict(sorted(self.first_mistakes.items())),
+        }
+
+
+def parse_games(lines: Iterable[str]) -> Iterator[tuple[int, list[int] | str]]:
+    """Line number and moves of each game, or an error message for a bad line."""
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        parts = text.replace(",", " ").split()
+        if len(parts) == 1:
+            parts = list(parts[0])
+        # isdigit would also pass digits int() rejects, such as superscripts
+        if not all(part.isdecimal() for part in parts):
+            yield number, f"Expected cell numbers, got {text!r}"
+            continue
+        yield number, [int(part) for part in parts]
+
+
+def grade_game(table: PositionTable, line: int, moves: list[int]) -> GameReport:
+    report = GameReport(line, moves)
+    side1 = side2 = 0
+    for ply, cell in enumerate(moves, 1):
+        if state_of(side1, side2) != GameState.IN_PROGRESS:
+            report.error = f"Move {ply} played after the game ended"
+            return report
+        if not 1 <= cell <= 9:
+            report.error = f"Move {ply} is not a cell between 1 and 9"
+            return report
+        bit = 1 << (cell - 1)
+        if (side1 | side2) & bit:
+            report.error = f"Move {ply} plays the occupied cell {cell}"
+            return report
+        best_value, best_moves = table.lookup(side1, side2)
+        side = 1 if ply % 2 else 2
+        if side == 1:
+            side1 |= bit
+        else:
+            side2 |= bit
+        if not best_moves & bit:
+            value = table.lookup(side1, side2)[0]
+            report.mistakes.append(ply)
+            report.points_lost[side] += abs(best_value - value)
+            # Results are the sign of the value: positive side 1 wins, 0 draws
+            if (best_value > 0) - (best_value < 0) != (value > 0) - (value < 0):
+                report.blunders.append(ply)
+    report.result = state_of(side1, side2).name
+    return report
+
+
+def grade_games(
+    table: PositionTable, games: Iterable[tuple[int, list[int] | str]]
+) -> Iterator[GameReport]:
+    for line, moves in games:
+        if isinstance(moves, str):
+            yield GameReport(line, [], error=moves)
+        else:
+            yield grade_game(table, line, moves)
+
+
+def analyze_log(table: PositionTable, lines: Iterable[str]) -> LogSummary:
+    """Grade every game in lines, keeping only the running totals."""
+    summary = LogSummary()
+    for report in grade_games(table, parse_games(lines)):
+        summary.add(report)
+    return summary
+
+
+if __name__ == "__main__":
+    from main import TABLEBASE_FILE
+
+    parser = argparse.ArgumentParser(
+        description="Grade logged games against perfect play, one game per line"
+    )
+    parser.add_argument(
+        "log",
+        nargs="?",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="Game log to read (default: stdin)",
+    )
+    parser.add_argument(
+        "--per-game",
+        action="store_true",
+        help="Print a JSON report for every game before the summary",
+    )
+    args = parser.parse_args()
+    tablebase = open_tablebase(cache_path(TABLEBASE_FILE))
+    summary = LogSummary()
+    for report in grade_games(tablebase, parse_games(args.log)):
+        summary.add(report)
+        if args.per_game:
+            print(json.dumps({**asdict(report), "first_mistake": report.first_mistake}))
+    print(json.dumps(summary.to_dict(), indent=2))
@@ -0,0 +1,150 @@
+import argparse
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from time import perf_counter
+
+from mnk import MNKGame
+from node import SYMMETRY_TABLES, GameState, canonical_key
+
+
+@dataclass
+class PathCounts:
+    # Complete games through a position, by total length in plies and result
+    games_by_length: dict[int, Counter[GameState]]
+    # Games in which every move from the position on is one of the mover's best
+    optimal_lines: int
+
+    @property
+    def games(self) -> int:
+        return sum(sum(outcomes.values()) for outcomes in self.games_by_length.values())
+
+    @property
+    def outcomes(self) -> Counter[GameState]:
+        total: Counter[GameState] = Counter()
+        for outcomes in self.games_by_length.values():
+            total.update(outcomes)
+        return total
+
+
+class GameTreeStats:
+    """Path and position counts by dynamic programming over the position DAG.
+
+    Every position's counts are the sum of its children's, so each position is
+    solved once however many games pass through it. Counts are memoized by
+    canonical key, which symmetric positions share since their counts are equal.
+    Works on any node view with side1/side2 bitboards: ``Node`` trees from
+    ``build_tree``, or ``LazyNode`` for other boards when game is given.
+    """
+
+    def __init__(self, game: MNKGame | None = None) -> None:
+        self.game = game
+        self.counts: dict[int, PathCounts] = {}
+
+    def _key(self, side1: int, side2: int) -> int:
+        if self.game is None:
+            return canonical_key(side1, side2)
+        return self.game.canonical_key(side1, side2)
+
+    def path_counts(self, node) -> PathCounts:
+        # Node views of symmetric boards share the stored node's subtree
+        node = getattr(node, "canonical", node)
+        key = self._key(node.side1, node.side2)
+        counts = self.counts.get(key)
+        if counts is not None:
+            return counts
+        if node.state != GameState.IN_PROGRESS:
+            length = (node.side1 | node.side2).bit_count()
+            counts = PathCounts({length: Counter({node.state: 1})}, 1)
+        else:
+            games_by_length: defaultdict[int, Counter[GameState]] = defaultdict(Counter)
+            for child in node.children:
+                for length, outcomes in self.path_counts(child).games_by_length.items():
+                    games_by_length[length].update(outcomes)
+            optimal_lines = sum(
+                self.path_counts(child).optimal_lines for child in node.get_best_moves()
+            )
+            counts = PathCounts(dict(sorted(games_by_length.items())), optimal_lines)
+        self.counts[key] = counts
+        return counts
+
+    def _orbit_size(self, side1: int, side2: int) -> int:
+        """Number of distinct boards symmetric to this one, itself included."""
+        if self.game is None:
+            return len({table[side1] | table[side2] << 9 for table in SYMMETRY_TABLES})
+        game = self.game
+        boards = set()
+        for cells in game.symmetries:
+            key = 0
+            for cell, target in enumerate(cells):
+                if side1 >> cell & 1:
+                    key |= 1 << target
+                elif side2 >> cell & 1:
+                    key |= 1 << (target + game.cells)
+            boards.add(key)
+        return len(boards)
+
+    def positions_by_ply(self, root) -> dict[int, int]:
+        """Distinct boards reachable at each ply of a game started from root.
+
+        Each symmetry class is visited once and counted by its size, which is only
+        exact from a start position every symmetry maps to itself, so root must be
+        the empty board.
+        """
+        if root.side1 | root.side2:
+            raise ValueError("Positions per ply are counted from the empty board")
+        positions: Counter[int] = Counter()
+        seen: set[int] = set()
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            node = getattr(node, "canonical", node)
+            key = self._key(node.side1, node.side2)
+            if key in seen:
+                continue
+            seen.add(key)
+            ply = (node.side1 | node.side2).bit_count()
+            positions[ply] += self._orbit_size(node.side1, node.side2)
+            pending.extend(node.children)
+        return dict(sorted(positions.items()))
+
+
+def print_report(stats: GameTreeStats, root) -> None:
+    start = perf_counter()
+    counts = stats.path_counts(root)
+    positions = stats.positions_by_ply(root)
+    elapsed = perf_counter() - start
+    print(f"Games: {counts.games:,}")
+    print(f"Optimal lines: {counts.optimal_lines:,}")
+    for state, games in counts.outcomes.most_common():
+        print(f"  {state.name}: {games:,}")
+    results = (GameState.SIDE1_WIN, GameState.SIDE2_WIN, GameState.DRAW)
+    print("Length  " + "  ".join(f"{state.name:>9}" for state in results))
+    for length, outcomes in counts.games_by_length.items():
+        print(
+            f"{length:>6}  " + "  ".join(f"{outcomes[state]:>9,}" for state in results)
+        )
+    print(f"Positions: {sum(positions.values()):,}")
+    for ply, count in positions.items():
+        print(f"  ply {ply}: {count:,}")
+    print(f"Counted {len(stats.counts):,} positions in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    from main import build_tree, parse_board_size
+
+    parser = argparse.ArgumentParser(
+        description="Count games, outcomes and positions of the game tree"
+    )
+    parser.add_argument(
+        "--size",
+        type=parse_board_size,
+        help="Solve an MxN or MxNxK board lazily instead of building the 3x3 tree",
+    )
+    args = parser.parse_args()
+    if args.size:
+        from lazy import LazyNode, LazySolver
+
+        game = MNKGame(*args.size)
+        print_report(GameTreeStats(game), LazyNode(LazySolver(game), 0, 0))
+    else:
+        print_report(GameTreeStats(), build_tree())
@@ -0,0 +1,69 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from time import perf_counter
+
+# Called with the phase name, its wall time in seconds and the stats at its end
+StatsHook = Callable[[str, float, "SolverStats"], None]
+
+
+@dataclass
+class SolverStats:
+    nodes_created: int = 0
+    transposition_hits: int = 0
+    transposition_misses: int = 0
+    # Calls to set_minimax_recursively, including ones answered from memo
+    minimax_calls: int = 0
+    # Positions actually solved by set_minimax_recursively
+    minimax_visits: int = 0
+    # Terminal positions scored
+    evaluations: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_invalidations: int = 0
+    # Wall time in seconds, summed per phase name
+    phase_times: dict[str, float] = field(default_factory=dict)
+    hooks: list[StatsHook] = field(default_factory=list, repr=False)
+
+    def reset(self) -> None:
+        """Zero every counter and timer; hooks stay registered."""
+        for counter in fields(self):
+            if counter.type is int:
+                setattr(self, counter.name, 0)
+        self.phase_times.clear()
+
+    def add_hook(self, hook: StatsHook) -> None:
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: StatsHook) -> None:
+        self.hooks.remove(hook)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+            for hook in self.hooks:
+                hook(name, elapsed, self)
+
+    def counters(self) -> dict[str, int]:
+        return {
+            counter.name: getattr(self, counter.name)
+            for counter in fields(self)
+            if counter.name not in ("phase_times", "hooks")
+        }
+
+    def report(self) -> str:
+        lines = ["📈 Solver stats"]
+        lines += [f"  {name}: {value}" for name, value in self.counters().items()]
+        lines += [
+            f"  {name} time: {seconds * 1000:.2f} ms"
+            for name, seconds in self.phase_times.items()
+        ]
+        return "\n".join(lines)
+
+
+STATS = SolverStats()
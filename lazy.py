@@ -0,0 +1,154 @@
+from collections import OrderedDict
+from typing import Self
+
+from instrumentation import STATS
+from mnk import EXACT, LOWER, UPPER, BitboardNode, MNKGame
+from node import DRAW_SCORE, WIN_SCORE, GameState
+
+
+class LazySolver:
+    """Exact minimax values solved on first request and kept in a bounded memo.
+
+    Values use the Node scoring: side 1 positive, WIN_SCORE minus the number of
+    pieces on the board at the win. Positions are solved by alpha-beta search, so
+    the memo holds bounds as well as exact values. Symmetric positions share one
+    entry, and the least recently used entries are evicted once there are more
+    than max_entries.
+    """
+
+    def __init__(
+        self, game: MNKGame | None = None, max_entries: int = 1_000_000
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.game = game or MNKGame()
+        self.max_entries = max_entries
+        # Canonical key -> (value, bound); bounds are left by alpha-beta cutoffs
+        self.values: OrderedDict[int, tuple[int, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def value(self, side1: int, side2: int) -> int:
+        return self._search(side1, side2, -WIN_SCORE, WIN_SCORE)
+
+    def _search(self, side1: int, side2: int, alpha: int, beta: int) -> int:
+        """Value of the position if it lies inside (alpha, beta), else a bound.
+
+        A result at or below alpha is an upper bound and one at or above beta a
+        lower bound, as in any fail-soft alpha-beta search.
+        """
+        key = self.game.canonical_key(side1, side2)
+        entry = self.values.get(key)
+        if entry is not None:
+            value, bound = entry
+            if (
+                bound == EXACT
+                or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)
+            ):
+                self.hits += 1
+                self.values.move_to_end(key)
+                return value
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+        self.misses += 1
+        value = self._solve(side1, side2, alpha, beta)
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.values[key] = (value, bound)
+        self.values.move_to_end(key)
+        if len(self.values) > self.max_entries:
+            self.values.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def _solve(self, side1: int, side2: int, alpha: int, beta: int) -> int:
+        game = self.game
+        depth = (side1 | side2).bit_count()
+        state = game.state_of(side1, side2)
+        if state != GameState.IN_PROGRESS:
+            STATS.evaluations += 1
+            if state == GameState.SIDE1_WIN:
+                return WIN_SCORE - depth
+            if state == GameState.SIDE2_WIN:
+                return depth - WIN_SCORE
+            return DRAW_SCORE
+        STATS.minimax_visits += 1
+        side1_to_move = side1.bit_count() == side2.bit_count()
+        mine, theirs = (side1, side2) if side1_to_move else (side2, side1)
+        sign = 1 if side1_to_move else -1
+        # Winning on the next move is the best result, losing on the one after the
+        # worst, so the value lies within these and the window can be narrowed
+        fastest_win = WIN_SCORE - depth - 1
+        if alpha >= fastest_win:
+            return fastest_win
+        if beta <= -fastest_win:
+            return -fastest_win
+        empty = [cell for cell in game.move_order if not (side1 | side2) >> cell & 1]
+        if any(game.wins(mine | 1 << cell, cell) for cell in empty):
+            return sign * fastest_win
+        # Any move that leaves an immediate win open loses as fast as possible, so
+        # when the opponent threatens one only the blocking moves can do better
+        threats = [cell for cell in empty if game.wins(theirs | 1 << cell, cell)]
+        if len(empty) > 1 and threats:
+            empty = threats
+        # Every value lies strictly inside +-WIN_SCORE, so the first move replaces it
+        best = -sign * WIN_SCORE
+        for cell in empty:
+            if side1_to_move:
+                value = self._search(side1 | 1 << cell, side2, alpha, beta)
+                best = max(best, value)
+                alpha = max(alpha, value)
+            else:
+                value = self._search(side1, side2 | 1 << cell, alpha, beta)
+                best = min(best, value)
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+        return best
+
+    def clear(self) -> None:
+        self.values.clear()
+
+    @property
+    def root(self) -> "LazyNode":
+        return LazyNode(self, 0, 0)
+
+
+class LazyNode(BitboardNode):
+    """``Node``-like view of a position, solved by a ``LazySolver`` when asked."""
+
+    __slots__ = ("solver",)
+
+    def __init__(self, solver: LazySolver, side1: int, side2: int) -> None:
+        super().__init__(side1, side2)
+        self.solver = solver
+
+    @property
+    def game(self) -> MNKGame:
+        return self.solver.game
+
+    @property
+    def minimax_value(self) -> int:
+        return self.solver.value(self.side1, self.side2)
+
+    def child(self, cell: int) -> Self:
+        return type(self)(self.solver, *self.played(cell))
+
+    def best_cells(self) -> list[int]:
+        values = {cell: child.minimax_value for cell, child in self.moves.items()}
+        if not values:
+            return []
+        pick = max if self.side_to_move == 1 else min
+        best_value = pick(values.values())
+        return [cell for cell, value in values.items() if value == best_value]
@@ -0,0 +1,88 @@
+from array import array
+
+from compact_tree import CompactNode
+from node import (
+    FULL_BOARD,
+    POSITION_COUNT,
+    Node,
+    position_id,
+    to_bits,
+)
+from tablebase import TablebaseNode
+
+Board = tuple[tuple[int, ...], ...] | tuple[int, int] | str | int
+
+EMPTY_CELLS = ".-0 "
+
+
+def board_index(board: Board) -> int:
+    """Base-3 position id of a board given in any supported form.
+
+    Accepts a tuple position, a (side 1, side 2) bitboard pair, a ``side1 |
+    side2 << 9`` key, or a string of nine cells using ``1`` and ``2`` for the
+    sides and ``0``, ``.``, ``-`` or a space for empty cells. ``|`` and line
+    breaks in strings are ignored.
+    """
+    if isinstance(board, int):
+        return position_id(board & FULL_BOARD, board >> 9)
+    if isinstance(board, str):
+        cells = board.replace("|", "").replace("\n", "")
+        if len(cells) != 9 or any(cell not in "12" + EMPTY_CELLS for cell in cells):
+            raise ValueError(f"Invalid board string: {board!r}")
+        return sum(
+            int(cell) * 3**index
+            for index, cell in enumerate(cells)
+            if cell not in EMPTY_CELLS
+        )
+    if len(board) == 2 and all(isinstance(bits, int) for bits in board):
+        return position_id(*board)  # type: ignore[arg-type]
+    return position_id(*to_bits(board))  # type: ignore[arg-type]
+
+
+class PerfectPlayTable:
+    """Dense table of value and best moves for all 3**9 boards, by base-3 id."""
+
+    def __init__(self) -> None:
+        self.values = array("b", bytes(POSITION_COUNT))
+        self.best_moves = array("H", bytes(2 * POSITION_COUNT))
+        self.reachable = bytearray(POSITION_COUNT)
+
+    @classmethod
+    def from_tree(cls, root: Node | CompactNode) -> "PerfectPlayTable":
+        table = cls()
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            index = position_id(node.side1, node.side2)
+            if table.reachable[index]:
+                continue
+            if node.minimax_value is None:
+                raise TypeError("Expected evaluated minimax_value on node")
+            table.values[index] = node.minimax_value
+            table.reachable[index] = 1
+            for child in node.get_best_moves():
+                changed = child.key ^ node.key
+                table.best_moves[index] |= (changed | changed >> 9) & FULL_BOARD
+            pending.extend(node.children)
+        return table
+
+    def lookup(self, side1: int, side2: int) -> tuple[int, int]:
+        """Minimax value and best-move bitmask of a reachable position."""
+        index = position_id(side1, side2)
+        if not self.reachable[index]:
+            raise KeyError("Position is not reachable from the empty board")
+        return self.values[index], self.best_moves[index]
+
+    def probe(self, board: Board) -> tuple[int, frozenset[int]]:
+        """Minimax value and best cell numbers (1-9) of a reachable board."""
+        index = board_index(board)
+        if not self.reachable[index]:
+            raise KeyError("Position is not reachable from the empty board")
+        best_moves = self.best_moves[index]
+        return self.values[index], frozenset(
+            cell + 1 for cell in range(9) if best_moves >> cell & 1
+        )
+
+    @property
+    def root(self) -> TablebaseNode:
+        return TablebaseNode(self, 0, 0)
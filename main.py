@@ -1,14 +1,30 @@
 import argparse
-import hashlib
 import os
 import sys
-from os import path
-from pathlib import Path
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
 from pickle import UnpicklingError, dump, load
 from random import choice
 from time import sleep
 
-from node import GameState, Node
+from cache import (
+    CACHE_DIR_ENV,
+    atomic_write,
+    cache_path,
+    exclusive_lock,
+    load_or_build,
+)
+from compact_tree import CompactNode, CompactTree
+from instrumentation import STATS
+from lazy import LazyNode, LazySolver
+from lookup import PerfectPlayTable
+from mcts import MCTSEngine, MCTSNode
+from mnk import MNKEngine, MNKGame, MNKNode
+from node import ENGINE_VERSION, GameState, Node, canonical_key, position_id
+from retrograde import retrograde_solve
+from tablebase import TablebaseNode, build_tablebase, open_tablebase
+
+GameNode = Node | CompactNode | TablebaseNode | MNKNode | LazyNode | MCTSNode
 
 
 def main() -> None:
@@ -18,8 +34,70 @@ def main() -> None:
         action="store_true",
         help="Rebuild the game tree from scratch instead of using cache",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["tablebase", "node", "compact", "table", "lazy", "mcts"],
+        default="tablebase",
+        help="Play from the memory-mapped tablebase (default), the pickled Node "
+        "tree, the array-backed compact tree, a lookup table built from the "
+        "Node tree, positions solved only when the game reaches them, or Monte "
+        "Carlo tree search within --move-time",
+    )
+    parser.add_argument(
+        "--size",
+        type=parse_board_size,
+        help="Play an MxN board with K in a row (e.g. 4x4 or 5x5x4; K defaults to "
+        "the shorter side) using the alpha-beta engine",
+    )
+    parser.add_argument(
+        "--move-time",
+        type=float,
+        default=1.0,
+        help="Seconds the alpha-beta or MCTS engine may search per move (default: 1.0)",
+    )
+    parser.add_argument(
+        "--playouts",
+        type=int,
+        help="Stop the MCTS engine after this many playouts per move",
+    )
+    parser.add_argument(
+        "--solver",
+        choices=SOLVERS,
+        default="minimax",
+        help="How the node and table engines solve a freshly built tree: "
+        "recursive minimax (default) or retrograde analysis by piece count",
+    )
+    parser.add_argument(
+        "--max-positions",
+        type=int,
+        default=1_000_000,
+        help="Solved positions the lazy engine keeps before evicting the least "
+        "recently used (default: 1000000)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help=f"Directory for the cached tree and tablebase (default: ${CACHE_DIR_ENV} "
+        "or the working directory)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print solver and cache counters and phase timings after startup",
+    )
     args = parser.parse_args()
 
+    # Load or build the engine in the background while the user answers the prompts
+    messages: list[str] = []
+    # Positions stored so far if the game tree is being built
+    built = 0
+
+    def track_build(positions: int) -> None:
+        nonlocal built
+        built = positions
+
+    loader = ThreadPoolExecutor(max_workers=1)
+    engine = loader.submit(load_engine, args, messages.append, track_build)
+
     print("🎮 Welcome to Tic-Tac-Toe!\n")
     # Ask the user which side they want to play
     decision = get_yes_or_no("Would you like to play as X?", random=True)
@@ -40,17 +118,30 @@ def main() -> None:
     else:
         print("📊 Evaluations hidden\n")
 
-    # Either load game tree from cache or create and cache it
-    root: Node | None = None
-    if not args.fresh:
-        root = load_cached_tree()
-    if not root:
-        print("🌳 Building game tree", end="", flush=True)
-        root = build_tree()
-        cache_tree(root)
-        print(" ✓ Done!\n")
+    # Wait for the engine that has been loading while the questions were asked
+    if not engine.done():
+        print("⏳ Loading engine...")
+        while True:
+            finished = wait([engine], timeout=0.1).done
+            if built:
+                end = "\n" if finished else ""
+                print(
+                    f"\r🌳 Building game tree... {built:,} positions",
+                    end=end,
+                    flush=True,
+                )
+            if finished:
+                break
+    root = engine.result()
+    loader.shutdown()
+    for message in messages:
+        print(message)
+    if args.stats:
+        print(STATS.report() + "\n")
     # Either set an empty board as the starting position for the human or select a random first move for the AI
-    current_node: Node = root if starting_player == "human" else choice(root.children)
+    current_node: GameNode = (
+        root if starting_player == "human" else choice(root.children)
+    )
     starting_side = human_side if starting_player == "human" else computer_side
     # Game loop
     while True:
@@ -88,96 +179,176 @@ def main() -> None:
             current_node = current_node.children[0]
         # Get a move from the user
         else:
-            i, j = prompt_user_move(current_node, show_eval)
-            new_position = Node.position_with_move(
-                current_node.position, i, j, current_node.side_to_move
-            )
-            for child in current_node.children:
-                if child.position == new_position:
-                    current_node = child
-                    break
+            cell = prompt_user_move(current_node, show_eval)
+            current_node = current_node.child(cell)
             print()
 
 
 CACHE_FILE = "tree-cache.pkl"
-NODE_FILE = Path(__file__).parent / "node.py"
+TABLEBASE_FILE = "tablebase.bin"
+# Bump when the layout of the pickled cache changes
+CACHE_FORMAT_VERSION = 3
+SOLVERS = ("minimax", "retrograde")
 
 
 def get_cache_version() -> str:
-    source = NODE_FILE.read_text()
-    return hashlib.md5(source.encode()).hexdigest()
+    return f"{ENGINE_VERSION}.{CACHE_FORMAT_VERSION}"
 
 
-def cache_tree(root: Node) -> None:
-    with open(CACHE_FILE, "wb") as file:
-        dump({"version": get_cache_version(), "tree": root}, file)
+def load_engine(
+    args: argparse.Namespace,
+    log: Callable[[str], None] = print,
+    progress: Callable[[int], None] | None = None,
+) -> GameNode:
+    """Load the engine selected on the command line, building and caching it if needed.
 
+    progress is passed on to build_tree when the game tree has to be built.
+    """
+    if args.engine == "mcts":
+        game = MNKGame(*args.size) if args.size else MNKGame()
+        return MCTSNode(MCTSEngine(game, args.move_time, args.playouts), 0, 0)
+    if args.engine == "lazy":
+        game = MNKGame(*args.size) if args.size else MNKGame()
+        return LazySolver(game, args.max_positions).root
+    if args.size:
+        engine = MNKEngine(MNKGame(*args.size), time_limit=args.move_time)
+        return MNKNode(engine, 0, 0)
+    if args.engine == "compact":
+        return CompactTree.build().root
+    if args.engine == "tablebase":
+        path = cache_path(TABLEBASE_FILE, args.cache_dir)
+        if args.fresh:
+            with exclusive_lock(path):
+                return build_tablebase(path, log).root
+        return open_tablebase(path, log).root
 
-def load_cached_tree() -> Node | None:
-    if not path.exists(CACHE_FILE):
-        return None
-    try:
-        with open(CACHE_FILE, mode="rb") as file:
-            data = load(file)
-        if not isinstance(data, dict):
-            print("⚠️  Cache format outdated, rebuilding...")
+    def build() -> Node:
+        tree = build_tree(args.solver, progress)
+        cache_tree(tree, args.cache_dir)
+        log("🌳 Built game tree ✓ Done!\n")
+        return tree
+
+    path = cache_path(CACHE_FILE, args.cache_dir)
+    if args.fresh:
+        with exclusive_lock(path):
+            tree = build()
+    else:
+        tree = load_or_build(
+            path, lambda quiet: load_cached_tree(log, args.cache_dir, quiet), build
+        )
+    return PerfectPlayTable.from_tree(tree).root if args.engine == "table" else tree
+
+
+def cache_tree(root: Node, directory: str | os.PathLike | None = None) -> None:
+    data = {"version": get_cache_version(), "tree": root}
+    with STATS.phase("cache_write"):
+        atomic_write(cache_path(CACHE_FILE, directory), lambda file: dump(data, file))
+
+
+def load_cached_tree(
+    log: Callable[[str], None] = print,
+    directory: str | os.PathLike | None = None,
+    quiet: bool = False,
+) -> Node | None:
+    """The cached tree, or None if it is missing, outdated or corrupted.
+
+    quiet skips the counters and warnings, for a repeated check of a cache that
+    has already been reported.
+    """
+    path = cache_path(CACHE_FILE, directory)
+
+    def invalid(message: str) -> None:
+        if not quiet:
+            STATS.cache_invalidations += 1
+            log(message)
+
+    with STATS.phase("cache_load"):
+        if not path.exists():
+            if not quiet:
+                STATS.cache_misses += 1
             return None
-        current_version = get_cache_version()
-        if data.get("version") != current_version:
-            print("⚠️  Node class changed, rebuilding cache...")
+        try:
+            with open(path, mode="rb") as file:
+                data = load(file)
+            if not isinstance(data, dict):
+                invalid("⚠️  Cache format outdated, rebuilding...")
+                return None
+            current_version = get_cache_version()
+            if data.get("version") != current_version:
+                invalid("⚠️  Engine version changed, rebuilding cache...")
+                return None
+            if not quiet:
+                STATS.cache_hits += 1
+            return data.get("tree")
+        except (UnpicklingError, EOFError, KeyError, AttributeError) as e:
+            invalid(f"⚠️  Cache corrupted ({type(e).__name__}), rebuilding...")
             return None
-        return data.get("tree")
-    except (UnpicklingError, EOFError, KeyError, AttributeError) as e:
-        print(f"⚠️  Cache corrupted ({type(e).__name__}), rebuilding...")
-        return None
 
 
-def build_tree() -> Node:
+def build_tree(
+    solver: str = "minimax", progress: Callable[[int], None] | None = None
+) -> Node:
+    """Expand the full game tree and solve it with "minimax" or "retrograde".
+
+    progress, if given, is called with the number of stored positions as each
+    new one is expanded.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver: {solver!r}")
     Node.nodes.clear()
-    initial_position = tuple(tuple(0 for _ in range(3)) for _ in range(3))
-    root = Node(side_to_move=1, position=initial_position)
-    Node.nodes[initial_position] = root
-    root.create_children_recursively()
-    root.set_minimax_recursively()
+    root = Node.from_bits(side_to_move=1, side1=0, side2=0)
+    Node.nodes[canonical_key(root.side1, root.side2)] = root
+    with STATS.phase("expand"):
+        for _ in root.expand():
+            if progress is not None:
+                progress(len(Node.nodes))
+    with STATS.phase("solve"):
+        if solver == "retrograde":
+            values = retrograde_solve()
+            for node in Node.nodes.values():
+                node.minimax_value = values[position_id(node.side1, node.side2)]
+        else:
+            root.set_minimax_recursively()
     return root
 
 
+def parse_board_size(value: str) -> tuple[int, int, int]:
+    try:
+        dimensions = [int(part) for part in value.lower().split("x")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid board size: {value}")
+    if len(dimensions) == 2:
+        dimensions.append(min(dimensions))
+    if len(dimensions) != 3 or min(dimensions) < 1:
+        raise argparse.ArgumentTypeError(f"Invalid board size: {value}")
+    m, n, k = dimensions
+    # Reject what MNKGame would, before the engine loads in the background
+    try:
+        MNKGame(m, n, k)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid board size {value}: {e}")
+    return m, n, k
+
+
 def prompt_user_move(
-    current_node: Node,
+    current_node: GameNode,
     show_eval: bool,
-) -> tuple[int, int]:
-    number_to_move = {
-        1: (0, 0),
-        2: (0, 1),
-        3: (0, 2),
-        4: (1, 0),
-        5: (1, 1),
-        6: (1, 2),
-        7: (2, 0),
-        8: (2, 1),
-        9: (2, 2),
-    }
-    print("👤 Your turn! Enter a cell number (1-9) or press Enter for a random move.")
-    available_moves = [
-        key
-        for key in number_to_move
-        if current_node.position[number_to_move[key][0]][number_to_move[key][1]] == 0
-    ]
+) -> int:
+    """Ask for a move and return the cell (0-based) the user played."""
+    moves = current_node.moves
+    # Every cell is either still free or already taken
+    cells = len(moves) + (current_node.side1 | current_node.side2).bit_count()
+    print(
+        f"👤 Your turn! Enter a cell number (1-{cells}) or press Enter for a random move."
+    )
+    available_moves = [cell + 1 for cell in sorted(moves)]
     available_moves_with_eval = None
     if show_eval:
         move_to_minimax: dict[int, int] = {}
-        for child in current_node.children:
-            for move in available_moves:
-                if (
-                    child.position[number_to_move[move][0]][number_to_move[move][1]]
-                    == current_node.side_to_move
-                ):
-                    if child.minimax_value is None:
-                        raise TypeError(
-                            "Expected evaluated minimax_value on child node"
-                        )
-                    move_to_minimax[move] = child.minimax_value
-                    break
+        for cell, child in sorted(moves.items()):
+            if child.minimax_value is None:
+                raise TypeError("Expected evaluated minimax_value on child node")
+            move_to_minimax[cell + 1] = child.minimax_value
         # Sort moves by value: descending for side 1 (higher is better), ascending for side 2 (lower is better)
         if current_node.side_to_move == 1:
             available_moves_with_eval = dict(
@@ -198,21 +369,19 @@ def prompt_user_move(
             if move == "":
                 move = choice(available_moves)
                 print(f"Random choice: {move}\n")
-                i, j = number_to_move[move]
                 break
             else:
                 if not move.isdigit():
                     raise ValueError("Please enter a valid number.")
             move = int(move)
-            if move not in number_to_move:
-                raise ValueError("Cell number must be between 1 and 9.")
-            i, j = number_to_move[move]
-            if current_node.position[i][j] != 0:
+            if not 1 <= move <= cells:
+                raise ValueError(f"Cell number must be between 1 and {cells}.")
+            if move - 1 not in moves:
                 raise ValueError("That cell is already occupied.")
             break
         except ValueError as e:
             print(f"❌ {e}")
-    return i, j
+    return move - 1
 
 
 def get_yes_or_no(prompt: str, random: bool = False, default: str | None = None) -> str:
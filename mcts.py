@@ -0,0 +1,278 @@
+import argparse
+from dataclasses import dataclass, field
+from math import log, sqrt
+from random import Random
+from time import perf_counter
+
+from compact_tree import CompactNode, CompactTree
+from mnk import EngineNode, MNKGame
+from node import WIN_SCORE, GameState
+
+
+@dataclass
+class MCTSResult:
+    # Playouts through each root move
+    move_visits: dict[int, int] = field(default_factory=dict)
+    # Mean reward of each root move for the side to move: 1 win, 0.5 draw, 0 loss
+    move_values: dict[int, float] = field(default_factory=dict)
+    playouts: int = 0
+    elapsed: float = 0.0
+    # Whether the search started from a subtree kept from the previous move
+    reused: bool = False
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.elapsed if self.elapsed else 0.0
+
+    def best_moves(self) -> list[int]:
+        """The most visited root moves."""
+        if not self.move_visits:
+            return []
+        most = max(self.move_visits.values())
+        return sorted(
+            cell for cell, visits in self.move_visits.items() if visits == most
+        )
+
+
+class SearchNode:
+    __slots__ = (
+        "side1",
+        "side2",
+        "parent",
+        "children",
+        "untried",
+        "visits",
+        "reward",
+        "side1_moved",
+        "outcome",
+    )
+
+    def __init__(
+        self,
+        side1: int,
+        side2: int,
+        parent: "SearchNode | None",
+        untried: list[int],
+        outcome: int | None,
+    ) -> None:
+        self.side1 = side1
+        self.side2 = side2
+        self.parent = parent
+        self.children: dict[int, SearchNode] = {}
+        # Legal moves not expanded yet, in random order
+        self.untried = untried
+        self.visits = 0
+        # Summed rewards for the side that made the move into this node
+        self.reward = 0.0
+        self.side1_moved = side1.bit_count() != side2.bit_count()
+        # 1 side 1 won, -1 side 2 won, 0 draw, None in progress
+        self.outcome = outcome
+
+
+class MCTSEngine:
+    """UCT search with random bitboard playouts, limited by time or playouts.
+
+    The search tree is kept between calls, so analysing a position that is a
+    child or grandchild of the previous one continues from its statistics.
+    """
+
+    def __init__(
+        self,
+        game: MNKGame | None = None,
+        time_limit: float | None = 1.0,
+        playout_limit: int | None = None,
+        exploration: float = 1.4,
+        seed: int | None = None,
+    ) -> None:
+        if time_limit is None and playout_limit is None:
+            raise ValueError("Set a time limit, a playout limit or both")
+        self.game = game or MNKGame()
+        self.time_limit = time_limit
+        self.playout_limit = playout_limit
+        self.exploration = exploration
+        self.rng = Random(seed)
+        self.root: SearchNode | None = None
+
+    def analyze(self, side1: int, side2: int) -> MCTSResult:
+        start = perf_counter()
+        root = self._reuse(side1, side2)
+        reused = root is not None
+        if root is None:
+            root = self._new_node(side1, side2, None, None)
+        root.parent = None
+        self.root = root
+        deadline = None if self.time_limit is None else start + self.time_limit
+        playouts = 0
+        while root.outcome is None:
+            if self.playout_limit is not None and playouts >= self.playout_limit:
+                break
+            if deadline is not None and playouts and perf_counter() >= deadline:
+                break
+            self._playout(root)
+            playouts += 1
+        return MCTSResult(
+            move_visits={cell: child.visits for cell, child in root.children.items()},
+            move_values={
+                cell: child.reward / child.visits
+                for cell, child in root.children.items()
+                if child.visits
+            },
+            playouts=playouts,
+            elapsed=perf_counter() - start,
+            reused=reused,
+        )
+
+    def _reuse(self, side1: int, side2: int) -> SearchNode | None:
+        # The position itself, our move from it, or the opponent's reply to that
+        pending = [(self.root, 0)] if self.root is not None else []
+        while pending:
+            node, depth = pending.pop()
+            if node.side1 == side1 and node.side2 == side2:
+                return node
+            if depth < 2:
+                pending.extend((child, depth + 1) for child in node.children.values())
+        return None
+
+    def _new_node(
+        self, side1: int, side2: int, parent: SearchNode | None, move: int | None
+    ) -> SearchNode:
+        game = self.game
+        outcome = None
+        if move is None:
+            state = game.state_of(side1, side2)
+            if state == GameState.SIDE1_WIN:
+                outcome = 1
+            elif state == GameState.SIDE2_WIN:
+                outcome = -1
+            elif state == GameState.DRAW:
+                outcome = 0
+        elif side1.bit_count() != side2.bit_count():
+            outcome = 1 if game.wins(side1, move) else None
+        else:
+            outcome = -1 if game.wins(side2, move) else None
+        if outcome is None and side1 | side2 == game.full_board:
+            outcome = 0
+        untried = []
+        if outcome is None:
+            occupied = side1 | side2
+            untried = [cell for cell in range(game.cells) if not occupied >> cell & 1]
+            self.rng.shuffle(untried)
+        return SearchNode(side1, side2, parent, untried, outcome)
+
+    def _playout(self, root: SearchNode) -> None:
+        node = root
+        # Selection: follow the best UCT child while every move has been tried
+        while node.outcome is None and not node.untried:
+            scale = self.exploration * sqrt(log(node.visits))
+            node = max(
+                node.children.values(),
+                key=lambda child: (
+                    child.reward / child.visits + scale / sqrt(child.visits)
+                ),
+            )
+        # Expansion
+        if node.outcome is None:
+            cell = node.untried.pop()
+            if node.side1_moved:
+                child = self._new_node(node.side1, node.side2 | 1 << cell, node, cell)
+            else:
+                child = self._new_node(node.side1 | 1 << cell, node.side2, node, cell)
+            node.children[cell] = child
+            node = child
+        outcome = node.outcome
+        if outcome is None:
+            outcome = self._rollout(node.side1, node.side2, not node.side1_moved)
+        # Backpropagation, each node scored for the side that moved into it
+        side1_reward = (outcome + 1) / 2
+        while node is not None:
+            node.visits += 1
+            node.reward += side1_reward if node.side1_moved else 1 - side1_reward
+            node = node.parent
+
+    def _rollout(self, side1: int, side2: int, side1_to_move: bool) -> int:
+        game = self.game
+        occupied = side1 | side2
+        empty = [cell for cell in range(game.cells) if not occupied >> cell & 1]
+        self.rng.shuffle(empty)
+        for cell in empty:
+            if side1_to_move:
+                side1 |= 1 << cell
+                if game.wins(side1, cell):
+                    return 1
+            else:
+                side2 |= 1 << cell
+                if game.wins(side2, cell):
+                    return -1
+            side1_to_move = not side1_to_move
+        return 0
+
+
+class MCTSNode(EngineNode[MCTSResult]):
+    """``Node``-like view of an m,n,k position, played by an ``MCTSEngine``.
+
+    ``minimax_value`` is an estimate scaled to +-WIN_SCORE from the search's win
+    rates, exact only for finished games.
+    """
+
+    __slots__ = ()
+
+    def analyzed_value(self) -> int:
+        if self.parent is not None:
+            mover = self.parent.side_to_move
+            win_rate = self.parent.analysis.move_values.get(self.move, 0.5)
+        else:
+            mover = self.side_to_move
+            best = self.analysis.best_moves()
+            win_rate = self.analysis.move_values.get(best[0], 0.5) if best else 0.5
+        side1_rate = win_rate if mover == 1 else 1 - win_rate
+        return round((2 * side1_rate - 1) * WIN_SCORE)
+
+    def best_cells(self) -> list[int]:
+        if self.state != GameState.IN_PROGRESS:
+            return []
+        return self.analysis.best_moves()
+
+
+def agreement_report(engine: MCTSEngine) -> tuple[int, int]:
+    """Positions where the engine plays a perfect move, out of all 3x3 positions."""
+    tree = CompactTree.build()
+    agreed = 0
+    positions = 0
+    for node_id in range(len(tree)):
+        node = CompactNode(tree, node_id)
+        if not node.children:
+            continue
+        perfect = {child.key for child in node.get_best_moves()}
+        chosen = MCTSNode(engine, node.side1, node.side2).get_best_moves()
+        agreed += chosen[0].key in perfect
+        positions += 1
+    return agreed, positions
+
+
+if __name__ == "__main__":
+    from main import parse_board_size
+
+    parser = argparse.ArgumentParser(description="Monte Carlo tree search player")
+    parser.add_argument("--size", type=parse_board_size, default=(3, 3, 3))
+    parser.add_argument("--move-time", type=float, default=0.1)
+    parser.add_argument("--playouts", type=int, help="Playouts per move")
+    parser.add_argument(
+        "--agreement",
+        action="store_true",
+        help="Compare every 3x3 move choice with the perfect solver",
+    )
+    args = parser.parse_args()
+    time_limit = None if args.playouts else args.move_time
+    engine = MCTSEngine(MNKGame(*args.size), time_limit, args.playouts, seed=0)
+    result = engine.analyze(0, 0)
+    print(
+        f"{result.playouts:,} playouts in {result.elapsed:.3f}s "
+        f"({result.playouts_per_second:,.0f} playouts/sec)"
+    )
+    print(f"Best moves: {[cell + 1 for cell in result.best_moves()]}")
+    if args.agreement:
+        agreed, positions = agreement_report(engine)
+        print(
+            f"Agreement with perfect play: {agreed}/{positions} "
+            f"({agreed / positions:.1%})"
+        )
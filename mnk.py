@@ -0,0 +1,561 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from math import inf
+from random import Random
+from time import perf_counter
+from typing import Protocol, Self
+
+from node import DRAW_SCORE, WIN_SCORE, GameState, position_to_str
+
+# Bound types stored in the transposition table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Rough size of one transposition table entry (slot, tuple and its ints)
+ENTRY_BYTES = 160
+MAX_CELLS = 64
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class MNKGame:
+    """Rules of an m x n board where k in a row wins.
+
+    Cell (i, j) is bit i * n + j of each side's bitboard.
+    """
+
+    def __init__(self, m: int = 3, n: int = 3, k: int = 3) -> None:
+        if not (1 <= k <= max(m, n)):
+            raise ValueError("k must fit on the board")
+        if m * n > MAX_CELLS:
+            raise ValueError(f"Boards are limited to {MAX_CELLS} cells")
+        self.m, self.n, self.k = m, n, k
+        self.cells = m * n
+        self.full_board = (1 << self.cells) - 1
+        lines: list[int] = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        lines.append(
+                            sum(1 << ((i + di * s) * n + j + dj * s) for s in range(k))
+                        )
+        self.lines = tuple(lines)
+        self.lines_through = tuple(
+            tuple(line for line in self.lines if line >> cell & 1)
+            for cell in range(self.cells)
+        )
+        # Cells on more lines are tried first when nothing better is known
+        self.move_order = tuple(
+            sorted(range(self.cells), key=lambda cell: -len(self.lines_through[cell]))
+        )
+        # Cell maps of the board's symmetries: all eight for squares, else the four
+        # that keep the m x n shape
+        transforms = [
+            lambda i, j: (i, j),
+            lambda i, j: (m - 1 - i, j),
+            lambda i, j: (i, n - 1 - j),
+            lambda i, j: (m - 1 - i, n - 1 - j),
+        ]
+        if m == n:
+            transforms += [
+                lambda i, j: (j, i),
+                lambda i, j: (j, n - 1 - i),
+                lambda i, j: (n - 1 - j, i),
+                lambda i, j: (n - 1 - j, n - 1 - i),
+            ]
+        self.symmetries = tuple(
+            tuple(
+                i * n + j
+                for i, j in (transform(r, c) for r in range(m) for c in range(n))
+            )
+            for transform in transforms
+        )
+        # Zobrist keys: ZOBRIST[0][cell] for the side to move's piece on cell, [1] for
+        # the opponent's. Fixed per board size so hashes are reproducible
+        rng = Random(f"zobrist-{m}x{n}")
+        self.zobrist = tuple(
+            tuple(rng.getrandbits(64) for _ in range(self.cells)) for _ in range(2)
+        )
+        # Mate scores are WIN_SCORE minus at most `cells` plies; heuristics stay below
+        self.mate_threshold = WIN_SCORE - self.cells - 1
+        self.heuristic_limit = self.mate_threshold - 1
+
+    def canonical_key(self, side1: int, side2: int) -> int:
+        """Smallest side1 | side2 << cells key over the board's symmetries."""
+        keys = []
+        for cells in self.symmetries:
+            key = 0
+            for cell, target in enumerate(cells):
+                if side1 >> cell & 1:
+                    key |= 1 << target
+                elif side2 >> cell & 1:
+                    key |= 1 << (target + self.cells)
+            keys.append(key)
+        return min(keys)
+
+    def zobrist_hash(self, mine: int, theirs: int) -> int:
+        """64-bit hash of a position from the side to move's point of view."""
+        value = 0
+        for cell in range(self.cells):
+            if mine >> cell & 1:
+                value ^= self.zobrist[0][cell]
+            elif theirs >> cell & 1:
+                value ^= self.zobrist[1][cell]
+        return value
+
+    def wins(self, bits: int, cell: int) -> bool:
+        """Whether the side owning bits completed a line by playing cell."""
+        for line in self.lines_through[cell]:
+            if bits & line == line:
+                return True
+        return False
+
+    def has_line(self, bits: int) -> bool:
+        return any(bits & line == line for line in self.lines)
+
+    def state_of(self, side1: int, side2: int) -> GameState:
+        if self.has_line(side1):
+            return GameState.SIDE1_WIN
+        if self.has_line(side2):
+            return GameState.SIDE2_WIN
+        if side1 | side2 == self.full_board:
+            return GameState.DRAW
+        return GameState.IN_PROGRESS
+
+    def to_position(self, side1: int, side2: int) -> tuple[tuple[int, ...], ...]:
+        return tuple(
+            tuple(
+                1 if side1 >> cell & 1 else 2 if side2 >> cell & 1 else 0
+                for cell in range(i * self.n, (i + 1) * self.n)
+            )
+            for i in range(self.m)
+        )
+
+    def heuristic(self, mine: int, theirs: int) -> int:
+        """Open-line score from the side to move's point of view."""
+        score = 0
+        for line in self.lines:
+            if not line & theirs:
+                score += (line & mine).bit_count() ** 2
+            elif not line & mine:
+                score -= (line & theirs).bit_count() ** 2
+        return max(-self.heuristic_limit, min(self.heuristic_limit, score))
+
+
+class TranspositionTable:
+    """Fixed-capacity transposition table with depth-preferred replacement.
+
+    Slots are chosen by a Zobrist hash when one is given, else by hash(key); the
+    full key is kept in the entry so colliding positions are never confused.
+    A slot is overwritten when it is empty, holds the same position, was stored
+    by an earlier search, or holds a shallower result than the new one.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.capacity = max(1, max_bytes // ENTRY_BYTES)
+        # (key, generation, depth, value, bound, best move)
+        self.entries: list[tuple[int, int, int, int, int, int] | None] = [
+            None
+        ] * self.capacity
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    def get(
+        self, key: int, zobrist: int | None = None
+    ) -> tuple[int, int, int, int, int, int] | None:
+        slot = (hash(key) if zobrist is None else zobrist) % self.capacity
+        entry = self.entries[slot]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(
+        self,
+        key: int,
+        depth: int,
+        value: int,
+        bound: int,
+        best_move: int,
+        zobrist: int | None = None,
+    ) -> None:
+        slot = (hash(key) if zobrist is None else zobrist) % self.capacity
+        entry = self.entries[slot]
+        if entry is not None and entry[0] != key:
+            if entry[1] == self.generation and entry[2] > depth:
+                return
+            self.replacements += 1
+        self.entries[slot] = (key, self.generation, depth, value, bound, best_move)
+        self.stores += 1
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self.entries)
+
+
+@dataclass
+class SearchResult:
+    # Value of each legal move (cell index), from side 1's point of view with
+    # wins scored WIN_SCORE - depth as in Node.minimax_value
+    move_values: dict[int, int] = field(default_factory=dict)
+    depth: int = 0
+    nodes: int = 0
+    complete: bool = False
+    elapsed: float = 0.0
+
+
+class MNKEngine:
+    """Iterative-deepening alpha-beta search over an MNKGame.
+
+    Each search stops at the first of: the time limit, the node limit, the
+    maximum depth, or a depth that reaches the end of the game, and reports
+    the deepest completed iteration.
+    """
+
+    def __init__(
+        self,
+        game: MNKGame,
+        time_limit: float | None = 1.0,
+        node_limit: int | None = None,
+        table_bytes: int = 64 * 1024 * 1024,
+        max_depth: int | None = None,
+    ) -> None:
+        self.game = game
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.table = TranspositionTable(table_bytes)
+        self.history = [0] * game.cells
+        self._nodes = 0
+        self._deadline = inf
+        self._budgeted = False
+
+    def analyze(self, side1: int, side2: int) -> SearchResult:
+        """Value of every legal move in a position that is still in progress."""
+        game = self.game
+        start = perf_counter()
+        side1_to_move = side1.bit_count() == side2.bit_count()
+        mine, theirs = (side1, side2) if side1_to_move else (side2, side1)
+        empties = game.cells - (side1 | side2).bit_count()
+        pieces = game.cells - empties
+        self.table.new_search()
+        self._nodes = 0
+        result = SearchResult()
+        last_depth = empties if self.max_depth is None else min(empties, self.max_depth)
+        for depth in range(1, last_depth + 1):
+            # The first iteration always completes so there is a move to report
+            self._budgeted = depth > 1
+            if self.time_limit is None:
+                self._deadline = inf
+            else:
+                self._deadline = start + self.time_limit
+            try:
+                values = self._search_root(mine, theirs, depth)
+            except SearchTimeout:
+                break
+            result.move_values = {
+                cell: self._to_side1(value, pieces, side1_to_move)
+                for cell, value in values.items()
+            }
+            result.depth = depth
+            result.complete = depth == empties
+        result.nodes = self._nodes
+        result.elapsed = perf_counter() - start
+        return result
+
+    def _to_side1(self, value: int, pieces: int, side1_to_move: bool) -> int:
+        # Relative mate distances become depth from the empty board
+        if value > self.game.mate_threshold:
+            value -= pieces
+        elif value < -self.game.mate_threshold:
+            value += pieces
+        return value if side1_to_move else -value
+
+    def _ordered_moves(self, empty: int, first: int = -1) -> list[int]:
+        moves = [cell for cell in self.game.move_order if empty >> cell & 1]
+        moves.sort(key=lambda cell: -self.history[cell])
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def _search_root(self, mine: int, theirs: int, depth: int) -> dict[int, int]:
+        game = self.game
+        values: dict[int, int] = {}
+        empty = game.full_board & ~(mine | theirs)
+        key = mine | theirs << game.cells
+        zobrist = game.zobrist_hash(mine, theirs)
+        swapped = game.zobrist_hash(theirs, mine)
+        entry = self.table.get(key, zobrist)
+        for cell in self._ordered_moves(empty, entry[5] if entry else -1):
+            # Every root move gets a full window so all of their values are exact
+            values[cell] = self._child_value(
+                mine, theirs, zobrist, swapped, cell, depth, -inf, inf
+            )
+        best = max(values, key=values.__getitem__)
+        self.table.store(
+            key, min(depth, empty.bit_count()), values[best], EXACT, best, zobrist
+        )
+        return values
+
+    def _child_value(
+        self,
+        mine: int,
+        theirs: int,
+        zobrist: int,
+        swapped: int,
+        cell: int,
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> int:
+        # zobrist hashes (mine, theirs) and swapped hashes (theirs, mine); after the
+        # move the opponent is to move, so the two trade places with one XOR each
+        game = self.game
+        mine |= 1 << cell
+        if game.wins(mine, cell):
+            return WIN_SCORE - 1
+        if mine | theirs == game.full_board:
+            return DRAW_SCORE
+        value = -self._negamax(
+            theirs,
+            mine,
+            swapped ^ game.zobrist[1][cell],
+            zobrist ^ game.zobrist[0][cell],
+            depth - 1,
+            -beta,
+            -alpha,
+        )
+        # Mate distances grow by one ply on the way up
+        if value > game.mate_threshold:
+            return value - 1
+        if value < -game.mate_threshold:
+            return value + 1
+        return value
+
+    def _negamax(
+        self,
+        mine: int,
+        theirs: int,
+        zobrist: int,
+        swapped: int,
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> int:
+        game = self.game
+        self._nodes += 1
+        if self._budgeted:
+            if self._nodes & 1023 == 0 and perf_counter() > self._deadline:
+                raise SearchTimeout
+            if self.node_limit is not None and self._nodes > self.node_limit:
+                raise SearchTimeout
+        if depth <= 0:
+            return game.heuristic(mine, theirs)
+        empty = game.full_board & ~(mine | theirs)
+        # Searches that reach the end of the game are exact at any deeper depth
+        depth = min(depth, empty.bit_count())
+        key = mine | theirs << game.cells
+        entry = self.table.get(key, zobrist)
+        tt_move = -1
+        if entry is not None:
+            _, _, stored_depth, stored_value, bound, tt_move = entry
+            if stored_depth >= depth:
+                if bound == EXACT:
+                    return stored_value
+                if bound == LOWER and stored_value >= beta:
+                    return stored_value
+                if bound == UPPER and stored_value <= alpha:
+                    return stored_value
+        original_alpha = alpha
+        best_value = -inf
+        best_move = -1
+        for cell in self._ordered_moves(empty, tt_move):
+            value = self._child_value(
+                mine, theirs, zobrist, swapped, cell, depth, alpha, beta
+            )
+            if value > best_value:
+                best_value = value
+                best_move = cell
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                self.history[cell] += depth * depth
+                break
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, depth, int(best_value), bound, best_move, zobrist)
+        return int(best_value)
+
+
+class BitboardNode(ABC):
+    """Base of the ``Node``-like views of a position held as two bitboards.
+
+    Subclasses name their ``game``, build children with ``child`` and decide how
+    positions are valued in ``minimax_value`` and ``get_best_moves``.
+    """
+
+    __slots__ = ("side1", "side2")
+
+    def __init__(self, side1: int, side2: int) -> None:
+        self.side1 = side1
+        self.side2 = side2
+
+    @property
+    @abstractmethod
+    def game(self) -> MNKGame: ...
+
+    @property
+    @abstractmethod
+    def minimax_value(self) -> int: ...
+
+    @abstractmethod
+    def child(self, cell: int) -> Self: ...
+
+    @abstractmethod
+    def best_cells(self) -> list[int]:
+        """Cells of the side to move's best moves, none once the game is over."""
+
+    def get_best_moves(self) -> list[Self]:
+        return [self.child(cell) for cell in self.best_cells()]
+
+    @property
+    def key(self) -> int:
+        return self.side1 | self.side2 << self.game.cells
+
+    @property
+    def position(self) -> tuple[tuple[int, ...], ...]:
+        return self.game.to_position(self.side1, self.side2)
+
+    @property
+    def side_to_move(self) -> int:
+        return 1 if self.side1.bit_count() == self.side2.bit_count() else 2
+
+    @property
+    def state(self) -> GameState:
+        return self.game.state_of(self.side1, self.side2)
+
+    def played(self, cell: int) -> tuple[int, int]:
+        """Bitboards after the side to move plays cell."""
+        if self.side_to_move == 1:
+            return self.side1 | 1 << cell, self.side2
+        return self.side1, self.side2 | 1 << cell
+
+    @property
+    def moves(self) -> dict[int, Self]:
+        """Children keyed by the cell played to reach them."""
+        if self.state != GameState.IN_PROGRESS:
+            return {}
+        occupied = self.side1 | self.side2
+        return {
+            cell: self.child(cell)
+            for cell in range(self.game.cells)
+            if not occupied >> cell & 1
+        }
+
+    @property
+    def children(self) -> list[Self]:
+        return list(self.moves.values())
+
+    def to_str(self, starting_side: str) -> str:
+        return position_to_str(self.position, starting_side)
+
+    def final_value(self) -> int:
+        """Value of a finished game, scored as ``Node.evaluate_state`` does."""
+        state = self.state
+        depth = (self.side1 | self.side2).bit_count()
+        if state == GameState.SIDE1_WIN:
+            return WIN_SCORE - depth
+        if state == GameState.SIDE2_WIN:
+            return depth - WIN_SCORE
+        return DRAW_SCORE
+
+
+class Analyzer[R](Protocol):
+    game: MNKGame
+
+    def analyze(self, side1: int, side2: int) -> R: ...
+
+
+class EngineNode[R](BitboardNode):
+    """``BitboardNode`` valued by an engine's analysis of it or of its parent.
+
+    Searching a position values all of its moves at once, so children read their
+    value from the parent's analysis instead of searching again.
+    """
+
+    __slots__ = ("engine", "parent", "move", "_value", "_analysis")
+
+    def __init__(
+        self,
+        engine: Analyzer[R],
+        side1: int,
+        side2: int,
+        parent: Self | None = None,
+        move: int = -1,
+    ) -> None:
+        super().__init__(side1, side2)
+        self.engine = engine
+        self.parent = parent
+        self.move = move
+        self._value: int | None = None
+        self._analysis: R | None = None
+
+    @property
+    def game(self) -> MNKGame:
+        return self.engine.game
+
+    @property
+    def analysis(self) -> R:
+        if self._analysis is None:
+            self._analysis = self.engine.analyze(self.side1, self.side2)
+        return self._analysis
+
+    @property
+    def minimax_value(self) -> int:
+        if self._value is None:
+            if self.state == GameState.IN_PROGRESS:
+                self._value = self.analyzed_value()
+            else:
+                self._value = self.final_value()
+        return self._value
+
+    @abstractmethod
+    def analyzed_value(self) -> int:
+        """Value of a position in play, from the parent's analysis if it has one."""
+
+    def child(self, cell: int) -> Self:
+        return type(self)(self.engine, *self.played(cell), self, cell)
+
+
+class MNKNode(EngineNode[SearchResult]):
+    """``Node``-like view of an m,n,k position, evaluated by an ``MNKEngine``."""
+
+    __slots__ = ()
+
+    def analyzed_value(self) -> int:
+        if self.parent is not None:
+            return self.parent.analysis.move_values[self.move]
+        pick = max if self.side_to_move == 1 else min
+        return pick(self.analysis.move_values.values())
+
+    def best_cells(self) -> list[int]:
+        if self.state != GameState.IN_PROGRESS:
+            return []
+        values = self.analysis.move_values
+        pick = max if self.side_to_move == 1 else min
+        best_value = pick(values.values())
+        return [cell for cell, value in sorted(values.items()) if value == best_value]
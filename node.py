@@ -1,10 +1,66 @@
+from collections.abc import Iterator
 from enum import Enum, auto
 from math import inf
 from typing import ClassVar
 
+from instrumentation import STATS
+
+# Bump when move generation, game rules or scoring change so cached trees are rebuilt
+ENGINE_VERSION = 1
 WIN_SCORE = 100
 DRAW_SCORE = 0
 
+# Bitboard layout: cell (i, j) is bit i * 3 + j, one 9-bit integer per side
+FULL_BOARD = 0b111_111_111
+WIN_MASKS: tuple[int, ...] = (
+    # Rows
+    0b000_000_111,
+    0b000_111_000,
+    0b111_000_000,
+    # Columns
+    0b001_001_001,
+    0b010_010_010,
+    0b100_100_100,
+    # Diagonals
+    0b100_010_001,
+    0b001_010_100,
+)
+
+# Whether a side's 9-bit board contains a complete line, for every possible board
+HAS_LINE: tuple[bool, ...] = tuple(
+    any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL_BOARD + 1)
+)
+
+# The eight symmetries of the board (dihedral group D4) as cell maps (i, j) -> (i', j')
+SYMMETRIES: tuple[tuple[int, ...], ...] = tuple(
+    tuple(i * 3 + j for i, j in (transform(r, c) for r in range(3) for c in range(3)))
+    for transform in (
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    )
+)
+# SYMMETRY_TABLES[s][bits] is the 9-bit board bits mapped through symmetry s
+SYMMETRY_TABLES: tuple[tuple[int, ...], ...] = tuple(
+    tuple(
+        sum(1 << cells[cell] for cell in range(9) if bits >> cell & 1)
+        for bits in range(FULL_BOARD + 1)
+    )
+    for cells in SYMMETRIES
+)
+
+# BASE3[bits] is the sum of 3**cell over the cells set in a 9-bit board
+BASE3: tuple[int, ...] = tuple(
+    sum(3**cell for cell in range(9) if bits >> cell & 1)
+    for bits in range(FULL_BOARD + 1)
+)
+POSITION_COUNT = 3**9
+
 
 class GameState(Enum):
     IN_PROGRESS = auto()
@@ -13,17 +69,179 @@ class GameState(Enum):
     SIDE2_WIN = auto()
 
 
+def to_bits(position: tuple[tuple[int, ...], ...]) -> tuple[int, int]:
+    """Convert a tuple position into (side 1, side 2) bitboards."""
+    side1 = side2 = 0
+    for i, row in enumerate(position):
+        for j, cell in enumerate(row):
+            if cell == 1:
+                side1 |= 1 << (i * 3 + j)
+            elif cell == 2:
+                side2 |= 1 << (i * 3 + j)
+    return side1, side2
+
+
+def to_position(side1: int, side2: int) -> tuple[tuple[int, ...], ...]:
+    """Convert (side 1, side 2) bitboards into a tuple position."""
+    return tuple(
+        tuple(
+            1 if side1 >> (i * 3 + j) & 1 else 2 if side2 >> (i * 3 + j) & 1 else 0
+            for j in range(3)
+        )
+        for i in range(3)
+    )
+
+
+def position_to_str(position: tuple[tuple[int, ...], ...], starting_side: str) -> str:
+    second_side = "X" if starting_side == "O" else "O"
+    num_to_side = {1: starting_side, 2: second_side}
+
+    def transform(x: int) -> str:
+        return "[ ]" if x == 0 else f"[{num_to_side[x]}]"
+
+    return "\n".join(["".join(map(transform, row)) for row in position])
+
+
+def position_id(side1: int, side2: int) -> int:
+    """Base-3 index of a board: cell n contributes its owner (0, 1 or 2) * 3**n."""
+    return BASE3[side1] + 2 * BASE3[side2]
+
+
+def state_of(side1: int, side2: int) -> GameState:
+    if HAS_LINE[side1]:
+        return GameState.SIDE1_WIN
+    if HAS_LINE[side2]:
+        return GameState.SIDE2_WIN
+    if side1 | side2 == FULL_BOARD:
+        return GameState.DRAW
+    return GameState.IN_PROGRESS
+
+
+def canonical_key(side1: int, side2: int) -> int:
+    """Smallest side1 | side2 << 9 key over all eight symmetries of the board."""
+    return min(table[side1] | table[side2] << 9 for table in SYMMETRY_TABLES)
+
+
+def find_symmetry(side1: int, side2: int, to_side1: int, to_side2: int) -> int:
+    """Index of a symmetry mapping the first board onto the second."""
+    for s, table in enumerate(SYMMETRY_TABLES):
+        if table[side1] == to_side1 and table[side2] == to_side2:
+            return s
+    raise ValueError("Positions are not symmetric")
+
+
 class Node:
-    nodes: ClassVar[dict[tuple[tuple[int, ...], ...], "Node"]] = {}
+    # Transposition table keyed by canonical_key, so symmetric positions share a node
+    nodes: ClassVar[dict[int, "Node"]] = {}
 
     def __init__(
         self, side_to_move: int, position: tuple[tuple[int, ...], ...]
     ) -> None:
         self.side_to_move = side_to_move
-        self.position = position
-        self.children: list[Node] = []
-        self.state: GameState = Node.check_winner_or_drawn(position)
-        self.minimax_value: int | None = None
+        self.side1, self.side2 = to_bits(position)
+        self._children: list[Node] | None = []
+        self._moves: dict[int, Node] | None = None
+        self.state: GameState = state_of(self.side1, self.side2)
+        self._minimax_value: int | None = None
+        # Stored node this one mirrors, and the symmetry mapping it onto this board
+        self.canonical: Node = self
+        self.symmetry = 0
+        # Views of this stored node in other orientations, by their key
+        self._views: dict[int, Node] | None = None
+        STATS.nodes_created += 1
+
+    @classmethod
+    def from_bits(cls, side_to_move: int, side1: int, side2: int) -> "Node":
+        node = cls.__new__(cls)
+        node.side_to_move = side_to_move
+        node.side1 = side1
+        node.side2 = side2
+        node._children = []
+        node._moves = None
+        node.state = state_of(side1, side2)
+        node._minimax_value = None
+        node.canonical = node
+        node.symmetry = 0
+        node._views = None
+        STATS.nodes_created += 1
+        return node
+
+    @classmethod
+    def oriented(cls, canonical: "Node", side1: int, side2: int) -> "Node":
+        """Node for a board symmetric to a stored one, sharing its subtree lazily.
+
+        Each board gets one view, kept on the stored node, so walking the tree
+        creates at most one object per reachable board.
+        """
+        canonical = canonical.canonical
+        if canonical.side1 == side1 and canonical.side2 == side2:
+            return canonical
+        if canonical._views is None:
+            canonical._views = {}
+        key = side1 | side2 << 9
+        node = canonical._views.get(key)
+        if node is not None:
+            return node
+        node = cls.__new__(cls)
+        node.side_to_move = canonical.side_to_move
+        node.side1 = side1
+        node.side2 = side2
+        node._children = None
+        node._moves = None
+        node.state = canonical.state
+        node.canonical = canonical
+        node.symmetry = find_symmetry(canonical.side1, canonical.side2, side1, side2)
+        node._views = None
+        canonical._views[key] = node
+        STATS.nodes_created += 1
+        return node
+
+    @property
+    def minimax_value(self) -> int | None:
+        # Symmetric positions have the same value, held by the stored node
+        return self.canonical._minimax_value
+
+    @minimax_value.setter
+    def minimax_value(self, value: int | None) -> None:
+        self.canonical._minimax_value = value
+
+    @property
+    def children(self) -> list["Node"]:
+        if self._children is None:
+            # Map the stored node's children into this node's orientation
+            table = SYMMETRY_TABLES[self.symmetry]
+            self._children = [
+                Node.oriented(child, table[child.side1], table[child.side2])
+                for child in self.canonical.children
+            ]
+        return self._children
+
+    @children.setter
+    def children(self, children: list["Node"]) -> None:
+        self._children = children
+        self._moves = None
+
+    @property
+    def moves(self) -> dict[int, "Node"]:
+        """Children keyed by the cell (0-8) played to reach them."""
+        if self._moves is None:
+            occupied = self.side1 | self.side2
+            self._moves = {
+                ((child.side1 | child.side2) ^ occupied).bit_length() - 1: child
+                for child in self.children
+            }
+        return self._moves
+
+    def child(self, cell: int) -> "Node":
+        return self.moves[cell]
+
+    @property
+    def position(self) -> tuple[tuple[int, ...], ...]:
+        return to_position(self.side1, self.side2)
+
+    @property
+    def key(self) -> int:
+        return self.side1 | self.side2 << 9
 
     @staticmethod
     def position_with_move(
@@ -39,27 +257,28 @@ class Node:
 
     @classmethod
     def from_parent(cls, parent: "Node", i: int, j: int) -> "Node":
-        new_position = cls.position_with_move(
-            parent.position, i, j, parent.side_to_move
-        )
-        next_side_to_move = 1 if parent.side_to_move == 2 else 2
-        return cls(next_side_to_move, new_position)
-
-    def to_str(self, starting_side: str) -> str:
-        second_side = "X" if starting_side == "O" else "O"
-        num_to_side = {1: starting_side, 2: second_side}
+        return cls.from_cell(parent, i * 3 + j)
 
-        def transform(x: int) -> str:
-            return "[ ]" if x == 0 else f"[{num_to_side[x]}]"
+    @classmethod
+    def from_cell(cls, parent: "Node", cell: int) -> "Node":
+        move = 1 << cell
+        if parent.side_to_move == 1:
+            return cls.from_bits(2, parent.side1 | move, parent.side2)
+        return cls.from_bits(1, parent.side1, parent.side2 | move)
 
-        return "\n".join(["".join(map(transform, row)) for row in self.position])
+    def to_str(self, starting_side: str) -> str:
+        return position_to_str(self.position, starting_side)
 
     def append_child(self, child: "Node") -> None:
         self.children.append(child)
+        self._moves = None
 
     @staticmethod
     def evaluate(position: tuple[tuple[int, ...], ...], depth: int = 0) -> int:
-        state = Node.check_winner_or_drawn(position)
+        return Node.evaluate_state(Node.check_winner_or_drawn(position), depth)
+
+    @staticmethod
+    def evaluate_state(state: GameState, depth: int = 0) -> int:
         if state == GameState.SIDE1_WIN:
             return WIN_SCORE - depth
         if state == GameState.SIDE2_WIN:
@@ -70,52 +289,65 @@ class Node:
 
     @staticmethod
     def check_winner_or_drawn(position: tuple[tuple[int, ...], ...]) -> GameState:
-        for i in range(3):
-            # Check rows
-            if (
-                position[i][0] == position[i][1] == position[i][2]
-                and position[i][0] != 0
-            ):
-                return (
-                    GameState.SIDE1_WIN if position[i][0] == 1 else GameState.SIDE2_WIN
-                )
-            # Check columns
-            if (
-                position[0][i] == position[1][i] == position[2][i]
-                and position[0][i] != 0
-            ):
-                return (
-                    GameState.SIDE1_WIN if position[0][i] == 1 else GameState.SIDE2_WIN
-                )
-        # Check diagonals
-        if position[0][0] == position[1][1] == position[2][2] and position[0][0] != 0:
-            return GameState.SIDE1_WIN if position[0][0] == 1 else GameState.SIDE2_WIN
-        if position[0][2] == position[1][1] == position[2][0] and position[0][2] != 0:
-            return GameState.SIDE1_WIN if position[0][2] == 1 else GameState.SIDE2_WIN
-        # Check for full board without winner
-        if all(cell != 0 for row in position for cell in row):
-            return GameState.DRAW
-        return GameState.IN_PROGRESS
+        return state_of(*to_bits(position))
 
     def create_children_recursively(self) -> None:
-        if self.state != GameState.IN_PROGRESS:
+        for _ in self.expand():
+            pass
+
+    def expand(self, max_depth: int | None = None) -> Iterator["Node"]:
+        """Create the subtree below this node, yielding each newly stored position.
+
+        An explicit stack replaces recursion, visiting moves in the same order, so
+        the stored tree is the same and depth is not bound by the recursion limit.
+        Positions max_depth plies below this one are stored but not expanded, and
+        a caller that stops iterating early keeps the part built so far.
+        """
+        if self.state != GameState.IN_PROGRESS or max_depth == 0:
             return
-        for i in range(3):
-            for j in range(3):
-                if self.position[i][j] == 0:
-                    new_child = Node.from_parent(self, i, j)
-                    key = new_child.position
-                    if key in Node.nodes:
-                        new_child = Node.nodes[key]
-                        self.append_child(new_child)
-                    else:
-                        self.append_child(new_child)
-                        Node.nodes[key] = new_child
-                        new_child.create_children_recursively()
+        # Each entry is a node and the cells still to try from it
+        pending: list[tuple[Node, Iterator[int]]] = [(self, iter(range(9)))]
+        while pending:
+            node, cells = pending[-1]
+            occupied = node.side1 | node.side2
+            for cell in cells:
+                if occupied >> cell & 1:
+                    continue
+                new_child = Node.from_cell(node, cell)
+                key = canonical_key(new_child.side1, new_child.side2)
+                if key in Node.nodes:
+                    STATS.transposition_hits += 1
+                    new_child = Node.oriented(
+                        Node.nodes[key], new_child.side1, new_child.side2
+                    )
+                    node.append_child(new_child)
+                    continue
+                STATS.transposition_misses += 1
+                node.append_child(new_child)
+                Node.nodes[key] = new_child
+                yield new_child
+                if new_child.state == GameState.IN_PROGRESS and (
+                    max_depth is None or len(pending) < max_depth
+                ):
+                    # Finish the new position's subtree before its next sibling
+                    pending.append((new_child, iter(range(9))))
+                    break
+            else:
+                pending.pop()
 
     def set_minimax_recursively(self, depth: int = 0) -> int:
+        # Transposed and symmetric positions are shared through Node.nodes, so the
+        # tree is a DAG. Every path to a position has the same length, which makes
+        # the depth-adjusted value of a solved node safe to reuse.
+        STATS.minimax_calls += 1
+        if self.minimax_value is not None:
+            return self.minimax_value
+        if self.canonical is not self:
+            return self.canonical.set_minimax_recursively(depth)
+        STATS.minimax_visits += 1
         if self.state != GameState.IN_PROGRESS:
-            self.minimax_value = Node.evaluate(self.position, depth)
+            STATS.evaluations += 1
+            self.minimax_value = Node.evaluate_state(self.state, depth)
             return self.minimax_value
         if self.side_to_move == 1:
             max_eval = -inf
@@ -0,0 +1,183 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+from mnk import MNKGame
+from node import DRAW_SCORE, WIN_SCORE
+
+
+def solve_subtree(game: MNKGame, side1: int, side2: int) -> dict[int, int]:
+    """Exhaustively solve a position, returning the value of every position below it.
+
+    Values are keyed by side1 | side2 << cells and scored like
+    Node.minimax_value: positive for side 1, WIN_SCORE - depth for a win
+    reached at depth pieces from the empty board.
+    """
+    values: dict[int, int] = {}
+    _solve(game, side1, side2, values)
+    return values
+
+
+def _solve(game: MNKGame, side1: int, side2: int, values: dict[int, int]) -> int:
+    key = side1 | side2 << game.cells
+    value = values.get(key)
+    if value is not None:
+        return value
+    occupied = side1 | side2
+    depth = occupied.bit_count()
+    side1_to_move = side1.bit_count() == side2.bit_count()
+    best = -WIN_SCORE - 1 if side1_to_move else WIN_SCORE + 1
+    for cell in range(game.cells):
+        if occupied >> cell & 1:
+            continue
+        if side1_to_move:
+            child1, child2 = side1 | 1 << cell, side2
+            if game.wins(child1, cell):
+                value = WIN_SCORE - depth - 1
+                values[child1 | child2 << game.cells] = value
+            elif depth + 1 == game.cells:
+                value = DRAW_SCORE
+                values[child1 | child2 << game.cells] = value
+            else:
+                value = _solve(game, child1, child2, values)
+            best = max(best, value)
+        else:
+            child1, child2 = side1, side2 | 1 << cell
+            if game.wins(child2, cell):
+                value = depth + 1 - WIN_SCORE
+                values[child1 | child2 << game.cells] = value
+            elif depth + 1 == game.cells:
+                value = DRAW_SCORE
+                values[child1 | child2 << game.cells] = value
+            else:
+                value = _solve(game, child1, child2, values)
+            best = min(best, value)
+    values[key] = best
+    return best
+
+
+def frontier(game: MNKGame, split_depth: int) -> list[tuple[int, int]]:
+    """Distinct in-progress positions at split_depth, one per symmetry class."""
+    level = [(0, 0)]
+    for depth in range(split_depth):
+        seen: set[int] = set()
+        next_level = []
+        for side1, side2 in level:
+            occupied = side1 | side2
+            for cell in range(game.cells):
+                if occupied >> cell & 1:
+                    continue
+                if depth % 2 == 0:
+                    child1, child2 = side1 | 1 << cell, side2
+                    if game.wins(child1, cell):
+                        continue
+                else:
+                    child1, child2 = side1, side2 | 1 << cell
+                    if game.wins(child2, cell):
+                        continue
+                if child1 | child2 == game.full_board:
+                    continue
+                key = game.canonical_key(child1, child2)
+                if key not in seen:
+                    seen.add(key)
+                    next_level.append((child1, child2))
+        level = next_level
+    return level
+
+
+def parallel_solve(
+    game: MNKGame, workers: int | None = None, split_depth: int = 1
+) -> dict[int, int]:
+    """Solve the whole game, farming subtrees at split_depth out to worker processes.
+
+    Subtrees that differ only by a symmetry are solved once. The merged table
+    holds every position the workers reached; the positions above the split
+    are then solved locally against it, and the root value is at key 0.
+    """
+    tasks = frontier(game, split_depth)
+    values: dict[int, int] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(solve_subtree, game, side1, side2) for side1, side2 in tasks
+        ]
+        for future in futures:
+            values.update(future.result())
+    # Positions at the split that were skipped as symmetric copies share a value
+    by_symmetry = {
+        game.canonical_key(side1, side2): values[side1 | side2 << game.cells]
+        for side1, side2 in tasks
+    }
+    _solve_top(game, 0, 0, split_depth, values, by_symmetry)
+    return values
+
+
+def _solve_top(
+    game: MNKGame,
+    side1: int,
+    side2: int,
+    split_depth: int,
+    values: dict[int, int],
+    by_symmetry: dict[int, int],
+) -> None:
+    key = side1 | side2 << game.cells
+    if key in values:
+        return
+    depth = (side1 | side2).bit_count()
+    if depth == split_depth:
+        values[key] = by_symmetry[game.canonical_key(side1, side2)]
+        return
+    occupied = side1 | side2
+    for cell in range(game.cells):
+        if occupied >> cell & 1:
+            continue
+        if depth % 2 == 0:
+            child1, child2 = side1 | 1 << cell, side2
+            mover = child1
+        else:
+            child1, child2 = side1, side2 | 1 << cell
+            mover = child2
+        # Terminal children are scored by _solve below
+        if game.wins(mover, cell) or child1 | child2 == game.full_board:
+            continue
+        _solve_top(game, child1, child2, split_depth, values, by_symmetry)
+    # Every non-terminal child is now in the table
+    _solve(game, side1, side2, values)
+
+
+def speedup_report(
+    game: MNKGame, worker_counts: list[int], split_depth: int = 1
+) -> list[tuple[int, float, float]]:
+    """Wall time and speedup over one worker for each worker count."""
+    rows = []
+    baseline = None
+    for workers in worker_counts:
+        start = perf_counter()
+        parallel_solve(game, workers, split_depth)
+        elapsed = perf_counter() - start
+        if baseline is None:
+            baseline = elapsed
+        rows.append((workers, elapsed, baseline / elapsed))
+    return rows
+
+
+if __name__ == "__main__":
+    from main import parse_board_size
+
+    parser = argparse.ArgumentParser(description="Solve a board on several cores")
+    parser.add_argument("--size", type=parse_board_size, default=(3, 3, 3))
+    parser.add_argument("--split-depth", type=int, default=1)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, os.cpu_count() or 1],
+        help="Worker counts to compare",
+    )
+    args = parser.parse_args()
+    game = MNKGame(*args.size)
+    print(f"Root value: {parallel_solve(game, split_depth=args.split_depth)[0]}")
+    for workers, elapsed, speedup in speedup_report(
+        game, args.workers, args.split_depth
+    ):
+        print(f"{workers:>3} workers: {elapsed:8.3f}s  {speedup:5.2f}x")
@@ -0,0 +1,52 @@
+from array import array
+
+from node import BASE3, DRAW_SCORE, FULL_BOARD, HAS_LINE, POSITION_COUNT, WIN_SCORE
+
+# 9-bit boards grouped by how many cells they occupy
+BOARDS_BY_COUNT: tuple[tuple[int, ...], ...] = tuple(
+    tuple(bits for bits in range(FULL_BOARD + 1) if bits.bit_count() == count)
+    for count in range(10)
+)
+# CELL_OFFSETS[bits] is the position_id offset (3**cell) of each cell set in bits
+CELL_OFFSETS: tuple[tuple[int, ...], ...] = tuple(
+    tuple(3**cell for cell in range(9) if bits >> cell & 1)
+    for bits in range(FULL_BOARD + 1)
+)
+
+
+def retrograde_solve() -> array:
+    """Minimax value of every board with legal piece counts, indexed by position_id.
+
+    Boards are enumerated by piece count and solved from the full board back to
+    the empty one, so every child is final before its parents read it. Values use
+    the Node scoring, WIN_SCORE minus the number of pieces on the board at the win.
+    """
+    values = array("b", bytes(POSITION_COUNT))
+    for pieces in range(9, -1, -1):
+        side1_count, side2_count = (pieces + 1) // 2, pieces // 2
+        side1_to_move = side1_count == side2_count
+        win = WIN_SCORE - pieces
+        for side1 in BOARDS_BY_COUNT[side1_count]:
+            side1_id = BASE3[side1]
+            side1_line = HAS_LINE[side1]
+            for side2 in BOARDS_BY_COUNT[side2_count]:
+                if side1 & side2:
+                    continue
+                board_id = side1_id + 2 * BASE3[side2]
+                if side1_line:
+                    values[board_id] = win
+                elif HAS_LINE[side2]:
+                    values[board_id] = -win
+                elif pieces == 9:
+                    values[board_id] = DRAW_SCORE
+                elif side1_to_move:
+                    values[board_id] = max(
+                        values[board_id + offset]
+                        for offset in CELL_OFFSETS[FULL_BOARD ^ (side1 | side2)]
+                    )
+                else:
+                    values[board_id] = min(
+                        values[board_id + 2 * offset]
+                        for offset in CELL_OFFSETS[FULL_BOARD ^ (side1 | side2)]
+                    )
+    return values
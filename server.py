@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+from random import Random
+from statistics import quantiles
+from time import perf_counter
+
+from cache import cache_path
+from node import GameState
+from tablebase import PositionTable, TablebaseNode, open_tablebase
+
+# Requests and responses are one JSON object per line. Requests:
+#   {"op": "new", "computer_first": false}  start a game on this connection
+#   {"op": "move", "cell": 5}               play cell 1-9; the computer replies
+#   {"op": "eval"}                          value of every legal move
+# Responses describe the board after the request, or carry an "error".
+
+
+class Session:
+    """One game: a position in the shared table and nothing else."""
+
+    __slots__ = ("node",)
+
+    def __init__(self, node: TablebaseNode) -> None:
+        self.node = node
+
+
+class GameServer:
+    def __init__(self, table: PositionTable, seed: int | None = None) -> None:
+        self.table = table
+        self.rng = Random(seed)
+        self.active_sessions = 0
+        self.games_started = 0
+
+    def board(self, node: TablebaseNode) -> dict:
+        return {
+            "board": "".join(str(cell) for row in node.position for cell in row),
+            "state": node.state.name,
+            "side_to_move": node.side_to_move,
+            "value": node.minimax_value,
+        }
+
+    def computer_move(self, session: Session) -> None:
+        if session.node.state == GameState.IN_PROGRESS:
+            session.node = self.rng.choice(session.node.get_best_moves())
+
+    def handle_request(self, session: Session, request: dict) -> dict:
+        op = request.get("op")
+        if op == "new":
+            session.node = TablebaseNode(self.table, 0, 0)
+            self.games_started += 1
+            if request.get("computer_first"):
+                self.computer_move(session)
+            return self.board(session.node)
+        if op == "move":
+            cell = request.get("cell")
+            node = session.node
+            # JSON true and false decode to bools, which are ints in Python
+            if type(cell) is not int or not 1 <= cell <= 9:
+                return {"error": "Cell number must be between 1 and 9."}
+            if node.state != GameState.IN_PROGRESS:
+                return {"error": "The game is over."}
+            if (node.side1 | node.side2) >> (cell - 1) & 1:
+                return {"error": "That cell is already occupied."}
+            session.node = node.child(cell - 1)
+            self.computer_move(session)
+            return self.board(session.node)
+        if op == "eval":
+            return {
+                "moves": {
+                    str(cell + 1): child.minimax_value
+                    for cell, child in session.node.moves.items()
+                }
+            }
+        return {"error": f"Unknown op: {op!r}"}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        session = Session(TablebaseNode(self.table, 0, 0))
+        self.active_sessions += 1
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    response = {"error": "Expected a JSON object per line."}
+                else:
+                    response = self.handle_request(session, request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except ValueError:
+            # A request line longer than the stream limit
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.Server:
+        return await asyncio.start_server(
+            self.handle_connection, host, port, limit=1024
+        )
+
+
+async def _play_session(
+    host: str, port: int, rng: Random, latencies: list[float]
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(payload: dict) -> dict:
+        start = perf_counter()
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(perf_counter() - start)
+        return response
+
+    try:
+        response = await request({"op": "new", "computer_first": rng.random() < 0.5})
+        while response["state"] == GameState.IN_PROGRESS.name:
+            empty = [i + 1 for i, cell in enumerate(response["board"]) if cell == "0"]
+            response = await request({"op": "move", "cell": rng.choice(empty)})
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(
+    host: str, port: int, sessions: int, concurrency: int, seed: int | None = None
+) -> dict:
+    """Play random games against a server and report throughput and latency."""
+    rng = Random(seed)
+    latencies: list[float] = []
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_session() -> None:
+        async with limit:
+            await _play_session(host, port, rng, latencies)
+
+    start = perf_counter()
+    await asyncio.gather(*(one_session() for _ in range(sessions)))
+    elapsed = perf_counter() - start
+    cuts = quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "sessions": sessions,
+        "requests": len(latencies),
+        "elapsed": elapsed,
+        "sessions_per_second": sessions / elapsed,
+        "latency_ms": {
+            "p50": cuts[49] * 1000,
+            "p90": cuts[89] * 1000,
+            "p99": cuts[98] * 1000,
+        },
+    }
+
+
+async def serve_forever(host: str, port: int, table: PositionTable) -> None:
+    server = await GameServer(table).start(host, port)
+    print(f"🎮 Serving Tic-Tac-Toe on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    from main import TABLEBASE_FILE
+
+    parser = argparse.ArgumentParser(description="Tic-Tac-Toe game server")
+    parser.add_argument("mode", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    if args.mode == "serve":
+        tablebase = open_tablebase(cache_path(TABLEBASE_FILE))
+        asyncio.run(serve_forever(args.host, args.port, tablebase))
+    else:
+        report = asyncio.run(
+            run_load(args.host, args.port, args.sessions, args.concurrency)
+        )
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,132 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from random import Random
+from typing import Self
+
+from compact_tree import CompactTree
+from node import GameState
+from tablebase import TablebaseBuffer, TablebaseNode, tablebase_bytes
+
+
+def memory_buffer(memory: SharedMemory) -> memoryview:
+    buffer = memory.buf
+    if buffer is None:
+        raise ValueError("Shared memory block is closed")
+    return buffer
+
+
+class SharedTablebase(TablebaseBuffer):
+    """Tablebase held in a shared memory block instead of a file.
+
+    One process publishes it; worker processes attach by name and read the same
+    pages without copying them.
+    """
+
+    def __init__(self, memory: SharedMemory, owner: bool) -> None:
+        self._memory = memory
+        self._owner = owner
+        buffer = memory_buffer(memory).toreadonly()
+        try:
+            super().__init__(buffer)
+        except ValueError:
+            buffer.release()
+            self._free()
+            raise
+
+    @classmethod
+    def publish(cls, name: str | None = None, tree: CompactTree | None = None) -> Self:
+        """Solve the game into a new shared memory block, unlinked on close."""
+        data = tablebase_bytes(tree)
+        memory = SharedMemory(name, create=True, size=len(data))
+        memory_buffer(memory)[: len(data)] = data
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> Self:
+        # Only the publisher decides when the block goes away
+        return cls(SharedMemory(name, track=False), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def close(self) -> None:
+        super().close()
+        self._free()
+
+    def _free(self) -> None:
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+# The table a pool worker attached to in its initializer
+_worker_table: SharedTablebase | None = None
+
+
+def attach_worker(name: str) -> None:
+    """ProcessPoolExecutor initializer attaching the worker to a published table."""
+    global _worker_table
+    _worker_table = SharedTablebase.attach(name)
+
+
+def worker_table() -> SharedTablebase:
+    if _worker_table is None:
+        raise RuntimeError("Worker is not attached to a shared tablebase")
+    return _worker_table
+
+
+def play_random_games(games: int, seed: int) -> tuple[dict[str, int], int]:
+    """Play perfect against random on the worker's table; outcomes and peak RSS.
+
+    The peak RSS is in kilobytes, or 0 on Windows where it is not available.
+    """
+    table = worker_table()
+    rng = Random(seed)
+    outcomes = {"perfect": 0, "random": 0, "draw": 0}
+    for game in range(games):
+        perfect_side = 1 if game % 2 == 0 else 2
+        node = TablebaseNode(table, 0, 0)
+        while node.state == GameState.IN_PROGRESS:
+            if node.side_to_move == perfect_side:
+                node = rng.choice(node.get_best_moves())
+            else:
+                node = rng.choice(node.children)
+        if node.state == GameState.DRAW:
+            outcomes["draw"] += 1
+        elif (node.state == GameState.SIDE1_WIN) == (perfect_side == 1):
+            outcomes["perfect"] += 1
+        else:
+            outcomes["random"] += 1
+    if os.name == "nt":
+        # The resource module is Unix only
+        return outcomes, 0
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports ru_maxrss in kilobytes, macOS in bytes
+    return outcomes, peak // 1024 if sys.platform == "darwin" else peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve one shared tablebase to a pool of worker processes"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--games", type=int, default=10_000)
+    args = parser.parse_args()
+    with SharedTablebase.publish() as table:
+        print(f"📦 Published {table.nbytes:,} bytes as {table.name}")
+        with ProcessPoolExecutor(
+            args.workers, initializer=attach_worker, initargs=(table.name,)
+        ) as executor:
+            jobs = [
+                executor.submit(play_random_games, args.games // args.workers, seed)
+                for seed in range(args.workers)
+            ]
+            for worker, job in enumerate(jobs):
+                outcomes, peak_kb = job.result()
+                print(f"Worker {worker}: {outcomes}, peak RSS {peak_kb / 1024:.1f} MB")
@@ -0,0 +1,231 @@
+import mmap
+import os
+import struct
+from collections.abc import Callable
+from pathlib import Path
+from typing import Protocol, Self
+
+from cache import atomic_write, load_or_build
+from compact_tree import CompactNode, CompactTree
+from instrumentation import STATS
+from mnk import BitboardNode, MNKGame
+from node import (
+    ENGINE_VERSION,
+    FULL_BOARD,
+    POSITION_COUNT,
+    GameState,
+    position_id,
+    state_of,
+    to_position,
+)
+
+MAGIC = b"TTTB"
+FORMAT_VERSION = 2
+# Magic, format version, engine version, cells per board, record size, record count
+HEADER = struct.Struct("<4sHHBBI")
+# Minimax value, flags, best-move bitmask (bit n = cell n)
+RECORD = struct.Struct("<bBH")
+REACHABLE = 0x01
+# TablebaseNode views are always of the 3x3 board
+GAME = MNKGame()
+
+
+class PositionTable(Protocol):
+    def lookup(self, side1: int, side2: int) -> tuple[int, int]: ...
+
+
+def best_moves_mask(tree: CompactTree, node_id: int) -> int:
+    mask = 0
+    key = tree.keys[node_id]
+    for child in CompactNode(tree, node_id).get_best_moves():
+        mask |= child.key ^ key
+    # Fold side 2's half of the key onto the cell bits
+    return (mask | mask >> 9) & FULL_BOARD
+
+
+def tablebase_bytes(tree: CompactTree | None = None) -> bytearray:
+    """Header and records of a tablebase, as written to disk or shared memory."""
+    if tree is None:
+        with STATS.phase("expand_and_solve"):
+            tree = CompactTree.build()
+    data = bytearray(HEADER.size + RECORD.size * POSITION_COUNT)
+    HEADER.pack_into(
+        data, 0, MAGIC, FORMAT_VERSION, ENGINE_VERSION, 9, RECORD.size, POSITION_COUNT
+    )
+    for node_id, key in enumerate(tree.keys):
+        index = position_id(key & FULL_BOARD, key >> 9)
+        RECORD.pack_into(
+            data,
+            HEADER.size + index * RECORD.size,
+            tree.values[node_id],
+            REACHABLE,
+            best_moves_mask(tree, node_id),
+        )
+    return data
+
+
+def write_tablebase(path: str | os.PathLike, tree: CompactTree | None = None) -> None:
+    data = tablebase_bytes(tree)
+    with STATS.phase("cache_write"):
+        atomic_write(path, lambda file: file.write(data))
+
+
+def check_header(buffer: bytes | mmap.mmap | memoryview) -> None:
+    """Raise ValueError unless buffer holds a complete tablebase this code can read."""
+    try:
+        magic, version, engine, cells, record_size, count = HEADER.unpack_from(buffer)
+    except struct.error as e:
+        raise ValueError("Tablebase file is truncated") from e
+    if (magic, version, cells, record_size) != (MAGIC, FORMAT_VERSION, 9, RECORD.size):
+        raise ValueError("Tablebase format not supported")
+    if engine != ENGINE_VERSION:
+        raise ValueError("Tablebase built by another engine version")
+    if len(buffer) != HEADER.size + count * record_size:
+        raise ValueError("Tablebase file is truncated")
+
+
+class TablebaseBuffer:
+    """Tablebase records queried in place from a read-only buffer.
+
+    Subclasses own the memory the buffer views and free it after ``close``.
+    """
+
+    def __init__(self, buffer: memoryview) -> None:
+        check_header(buffer)
+        self._buffer = buffer
+
+    @property
+    def nbytes(self) -> int:
+        return self._buffer.nbytes
+
+    def close(self) -> None:
+        self._buffer.release()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def lookup(self, side1: int, side2: int) -> tuple[int, int]:
+        """Minimax value and best-move bitmask of a reachable position."""
+        offset = HEADER.size + position_id(side1, side2) * RECORD.size
+        value, flags, best_moves = RECORD.unpack_from(self._buffer, offset)
+        if not flags & REACHABLE:
+            raise KeyError("Position is not reachable from the empty board")
+        return value, best_moves
+
+    @property
+    def root(self) -> "TablebaseNode":
+        return TablebaseNode(self, 0, 0)
+
+
+class Tablebase(TablebaseBuffer):
+    """Read-only view of a tablebase file, queried in place through mmap."""
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        try:
+            super().__init__(buffer)
+        except ValueError:
+            buffer.release()
+            self._mmap.close()
+            raise
+
+    def close(self) -> None:
+        # The mmap cannot close while the buffer still exports it
+        super().close()
+        self._mmap.close()
+
+
+class TablebaseNode(BitboardNode):
+    """``Node``-like view of one position, answered from a ``Tablebase``."""
+
+    __slots__ = ("tablebase",)
+
+    def __init__(self, tablebase: PositionTable, side1: int, side2: int) -> None:
+        super().__init__(side1, side2)
+        self.tablebase = tablebase
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, TablebaseNode)
+            and self.tablebase is other.tablebase
+            and self.key == other.key
+        )
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    @property
+    def game(self) -> MNKGame:
+        return GAME
+
+    # The 3x3 board answers from node's lookup tables
+    @property
+    def position(self) -> tuple[tuple[int, ...], ...]:
+        return to_position(self.side1, self.side2)
+
+    @property
+    def state(self) -> GameState:
+        return state_of(self.side1, self.side2)
+
+    @property
+    def minimax_value(self) -> int:
+        return self.tablebase.lookup(self.side1, self.side2)[0]
+
+    def child(self, cell: int) -> Self:
+        return type(self)(self.tablebase, *self.played(cell))
+
+    def best_cells(self) -> list[int]:
+        best_moves = self.tablebase.lookup(self.side1, self.side2)[1]
+        return [cell for cell in range(9) if best_moves >> cell & 1]
+
+
+def load_tablebase(
+    path: str | os.PathLike, log: Callable[[str], None] = print, quiet: bool = False
+) -> Tablebase | None:
+    """The tablebase at path, or None if it is missing or stale.
+
+    quiet skips the counters and warnings, as in main.load_cached_tree.
+    """
+    with STATS.phase("cache_load"):
+        if not Path(path).exists():
+            if not quiet:
+                STATS.cache_misses += 1
+            return None
+        try:
+            tablebase = Tablebase(path)
+        except ValueError as e:
+            if not quiet:
+                STATS.cache_invalidations += 1
+                log(f"⚠️  {e}, rebuilding...")
+            return None
+        if not quiet:
+            STATS.cache_hits += 1
+        return tablebase
+
+
+def build_tablebase(
+    path: str | os.PathLike, log: Callable[[str], None] = print
+) -> Tablebase:
+    write_tablebase(path)
+    log("🌳 Built tablebase ✓ Done!\n")
+    return Tablebase(path)
+
+
+def open_tablebase(
+    path: str | os.PathLike, log: Callable[[str], None] = print
+) -> Tablebase:
+    """Open the tablebase at path, building it first if it is missing or stale.
+
+    When several processes start on a cold cache, one builds and the others wait
+    for it and open the result.
+    """
+    return load_or_build(
+        path,
+        lambda quiet: load_tablebase(path, log, quiet),
+        lambda: build_tablebase(path, log),
+    )
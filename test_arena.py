@@ -0,0 +1,38 @@
+from arena import (
+    depth_limited_policy,
+    perfect_policy,
+    random_policy,
+    run_arena,
+)
+from compact_tree import CompactTree
+from main import build_tree
+
+
+def test_perfect_player_never_loses_to_random():
+    report = run_arena(
+        CompactTree.build().root, perfect_policy(), random_policy(), 500, seed=0
+    )
+
+    assert report.games == 500
+    assert report.outcomes["player2"] == 0
+    assert report.outcomes["player1"] + report.outcomes["draw"] == 500
+    assert set(report.latency_percentiles()) == {"p50", "p90", "p99", "max"}
+
+
+def test_perfect_players_always_draw_on_node_tree():
+    report = run_arena(build_tree(), perfect_policy(), perfect_policy(), 50, seed=0)
+
+    assert report.outcomes["draw"] == 50
+
+
+def test_depth_limited_policy_plays_legal_moves():
+    report = run_arena(
+        CompactTree.build().root,
+        depth_limited_policy(2),
+        random_policy(),
+        20,
+        seed=0,
+    )
+
+    assert sum(report.outcomes.values()) == 20
+    assert report.games_per_second > 0
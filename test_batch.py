@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import BatchEvaluator  # noqa: E402
+from compact_tree import CompactNode  # noqa: E402
+from lookup import PerfectPlayTable  # noqa: E402
+from node import GameState, Node  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def evaluator(tree) -> BatchEvaluator:
+    return BatchEvaluator(PerfectPlayTable.from_tree(tree.root))
+
+
+def test_batch_matches_node_on_every_reachable_position(tree, evaluator):
+    nodes = [CompactNode(tree, node_id) for node_id in range(len(tree))]
+    boards = np.array([[cell for row in n.position for cell in row] for n in nodes])
+
+    result = evaluator.evaluate(boards)
+
+    assert result.reachable.all()
+    for node, state, side, value in zip(
+        nodes, result.states, result.side_to_move, result.values
+    ):
+        assert GameState(state) == Node.check_winner_or_drawn(node.position)
+        assert side == node.side_to_move
+        assert value == node.minimax_value
+
+
+def test_batch_flags_unreachable_boards(evaluator):
+    boards = np.array([[2, 2, 2, 0, 0, 0, 0, 0, 0], [0] * 9])
+
+    result = evaluator.evaluate(boards)
+
+    assert result.reachable.tolist() == [False, True]
+    assert GameState(result.states[0]) == GameState.SIDE2_WIN
+
+
+def test_batch_rejects_wrong_shape(evaluator):
+    with pytest.raises(ValueError):
+        evaluator.evaluate(np.zeros((3, 3)))
+
+
+def test_batch_rejects_cells_outside_0_to_2(evaluator):
+    # 3 would index past the table and -1 would wrap onto another board
+    for cell in (3, -1):
+        boards = np.zeros((2, 9), dtype=np.int8)
+        boards[1, 4] = cell
+        with pytest.raises(ValueError):
+            evaluator.evaluate(boards)
+
+
+def test_batch_rejects_non_integer_cells(evaluator):
+    with pytest.raises(ValueError):
+        evaluator.evaluate(np.full((2, 9), 1.5))
+    with pytest.raises(ValueError):
+        evaluator.evaluate(np.zeros((2, 9), dtype=bool))
@@ -0,0 +1,44 @@
+from bench import compare, run_benchmarks
+
+
+def test_run_benchmarks_reports_every_hot_path(tmp_path, monkeypatch):
+    # The user's cache directory is left alone
+    monkeypatch.setenv("TICTACTOE_CACHE_DIR", str(tmp_path))
+    results = run_benchmarks(repeat=1)
+    assert list(tmp_path.iterdir()) == []
+
+    assert set(results["timings"]) == {
+        "build_tree",
+        "expand_tree",
+        "solve_tree",
+        "retrograde_solve",
+        "cache_tree",
+        "load_cached_tree",
+        "get_best_moves_per_call",
+        "check_winner_or_drawn_per_call",
+        *(
+            f"{scheme}_key_lookup_{size}_per_call"
+            for scheme in ("tuple", "bitboard", "zobrist")
+            for size in ("3x3", "7x7")
+        ),
+    }
+    assert all(seconds > 0 for seconds in results["timings"].values())
+    assert results["memory"]["build_tree_peak_bytes"] > 0
+    assert results["counts"]["reachable_positions"] == 5478
+    assert results["counts"]["minimax_visits"] == results["counts"]["stored_nodes"]
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {
+        "timings": {"build_tree": 1.0, "solve_tree": 1.0},
+        "memory": {"build_tree_peak_bytes": 100},
+    }
+    results = {
+        "timings": {"build_tree": 1.2, "solve_tree": 2.0, "new_metric": 5.0},
+        "memory": {"build_tree_peak_bytes": 90},
+    }
+
+    regressions = compare(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("solve_tree")
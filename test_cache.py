@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import pickle
+from time import sleep
+
+import pytest
+
+import main
+from cache import CACHE_DIR_ENV, atomic_write, cache_path, load_or_build
+from tablebase import Tablebase, open_tablebase
+
+
+def test_atomic_write_replaces_file(tmp_path):
+    path = tmp_path / "data.bin"
+    atomic_write(path, lambda file: file.write(b"old"))
+    atomic_write(path, lambda file: file.write(b"new"))
+    assert path.read_bytes() == b"new"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["data.bin"]
+
+
+def test_failed_atomic_write_keeps_old_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"old")
+
+    def fail(file):
+        file.write(b"half")
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        atomic_write(path, fail)
+    assert path.read_bytes() == b"old"
+    assert [entry.name for entry in tmp_path.iterdir()] == ["data.bin"]
+
+
+def test_cache_path_uses_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "cache"))
+    assert cache_path("tree-cache.pkl") == tmp_path / "cache" / "tree-cache.pkl"
+    assert (tmp_path / "cache").is_dir()
+    assert cache_path("x", tmp_path) == tmp_path / "x"
+
+
+def test_tree_cache_round_trips_through_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    directory = tmp_path / "cache"
+    main.cache_tree(main.build_tree(), directory)
+    assert (directory / main.CACHE_FILE).exists()
+    assert not (tmp_path / main.CACHE_FILE).exists()
+    root = main.load_cached_tree(directory=directory)
+    assert root is not None
+    assert root.minimax_value == 0
+
+
+def _load(path):
+    if path.exists():
+        return pickle.loads(path.read_bytes())
+    return None
+
+
+def _build(path, builds):
+    with open(builds, "a") as log:
+        log.write("build\n")
+    sleep(0.3)
+    value = {"built": True}
+    atomic_write(path, lambda file: pickle.dump(value, file))
+    return value
+
+
+def _start(path, builds, results):
+    value = load_or_build(path, lambda quiet: _load(path), lambda: _build(path, builds))
+    results.put(value)
+
+
+def test_cold_cache_is_built_once(tmp_path):
+    path = tmp_path / "cache.pkl"
+    builds = tmp_path / "builds.log"
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [
+        context.Process(target=_start, args=(path, builds, results)) for _ in range(6)
+    ]
+    for process in processes:
+        process.start()
+    values = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+    assert builds.read_text() == "build\n"
+    assert values == [{"built": True}] * len(processes)
+
+
+def test_open_tablebase_builds_once_then_loads(tmp_path):
+    path = tmp_path / "tablebase.bin"
+    messages: list[str] = []
+    with open_tablebase(path, messages.append) as tablebase:
+        assert isinstance(tablebase, Tablebase)
+        assert tablebase.root.minimax_value == 0
+    assert messages == ["🌳 Built tablebase ✓ Done!\n"]
+    with open_tablebase(path, messages.append):
+        pass
+    assert len(messages) == 1
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file modes")
+def test_atomic_write_follows_the_umask(tmp_path):
+    path = tmp_path / "data.bin"
+    umask = os.umask(0o027)
+    try:
+        atomic_write(path, lambda file: file.write(b"data"))
+    finally:
+        os.umask(umask)
+    # Not a private 0600 temp file, so other users can read a shared cache
+    assert path.stat().st_mode & 0o777 == 0o640
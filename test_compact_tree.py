@@ -0,0 +1,64 @@
+import pytest
+
+from compact_tree import CompactNode, CompactTree, iter_node_tree, node_tree_bytes
+from main import build_tree
+from node import GameState, Node
+
+
+def test_compact_tree_matches_node_tree_values():
+    tree = CompactTree.build()
+    root = build_tree()
+
+    assert len(tree) == 5478
+    pending: list[tuple[Node, CompactNode]] = [(root, tree.root)]
+    seen: set[int] = set()
+    while pending:
+        node, compact = pending.pop()
+        if compact.key in seen:
+            continue
+        seen.add(compact.key)
+        assert compact.position == node.position
+        assert compact.state == node.state
+        assert compact.side_to_move == node.side_to_move
+        assert compact.minimax_value == node.minimax_value
+        by_key = {child.key: child for child in compact.children}
+        pending.extend((child, by_key[child.key]) for child in node.children)
+    assert len(seen) == len(tree)
+
+
+def test_compact_node_best_moves():
+    tree = CompactTree.build()
+    corner_reply = next(
+        child for child in tree.root.children if child.position[0][0] == 1
+    )
+
+    best = corner_reply.get_best_moves()
+    # Only the centre holds the draw against a corner opening
+    assert [move.position[1][1] for move in best] == [2]
+    assert all(move.minimax_value == 0 for move in best)
+    assert all(move.state == GameState.IN_PROGRESS for move in best)
+
+
+def test_compact_tree_is_smaller_than_node_tree(tree):
+    root = build_tree()
+    node_count = sum(1 for _ in iter_node_tree(root))
+    node_bytes = node_tree_bytes(root)
+
+    assert tree.nbytes / len(tree) < 32
+    # The compact tree stores every orientation and is still several times smaller
+    assert len(tree) > node_count
+    assert tree.nbytes * 2 < node_bytes
+    # About 23 bytes per position against about 250 per Node object
+    assert (node_bytes / node_count) / (tree.nbytes / len(tree)) > 5
+
+
+def test_compact_moves_index_children_by_cell():
+    root = CompactTree.build().root
+    assert sorted(root.moves) == list(range(9))
+    for cell, child in root.moves.items():
+        assert child.side1 == 1 << cell
+    reply = root.child(4).child(0)
+    assert (reply.side1, reply.side2) == (1 << 4, 1 << 0)
+    assert all(reply.child(cell) == child for cell, child in reply.moves.items())
+    with pytest.raises(KeyError):
+        reply.child(4)
@@ -0,0 +1,67 @@
+from game_log import analyze_log, grade_games, parse_games
+
+
+def grade(tablebase, line: str):
+    return next(grade_games(tablebase, parse_games([line])))
+
+
+def test_parse_games_accepts_separators_and_skips_comments():
+    lines = ["# header", "", "5 1 9", "5,1,9", "519", "5 x", "5 ²"]
+    games = list(parse_games(lines))
+    assert games[:3] == [(3, [5, 1, 9]), (4, [5, 1, 9]), (5, [5, 1, 9])]
+    # Superscript digits pass isdigit but not int()
+    assert [line for line, moves in games[3:]] == [6, 7]
+    assert all(isinstance(moves, str) for line, moves in games[3:])
+
+
+def test_perfect_game_has_no_mistakes(tablebase):
+    report = grade(tablebase, "5 1 9 3 2 8 7 4 6")
+    assert report.error is None
+    assert report.result == "DRAW"
+    assert report.mistakes == []
+    assert report.first_mistake is None
+    assert report.points_lost == {1: 0, 2: 0}
+
+
+def test_edge_reply_to_center_is_a_blunder(tablebase):
+    # O answers the centre on an edge, which loses; X then wins in 7 plies
+    report = grade(tablebase, "5 2 1 9 3 7 4 6 8")
+    assert report.first_mistake == 2
+    assert report.blunders[0] == 2
+    assert report.points_lost[2] > 0
+
+
+def test_slower_win_is_a_mistake_but_not_a_blunder(tablebase):
+    # X can win at once on 7 but plays 5, which still wins two moves later
+    report = grade(tablebase, "1 2 4 3 5 6 7")
+    assert report.result == "SIDE1_WIN"
+    assert 5 in report.mistakes
+    assert 5 not in report.blunders
+    assert report.points_lost[1] == 2
+
+
+def error(table, text: str) -> str:
+    report = grade(table, text)
+    assert report.error is not None
+    assert report.result is None
+    return report.error
+
+
+def test_illegal_games_are_reported_not_raised(tablebase):
+    assert "occupied" in error(tablebase, "5 5")
+    assert "between 1 and 9" in error(tablebase, "5 0")
+    assert "ended" in error(tablebase, "1 4 2 5 3 6")
+
+
+def test_analyze_log_streams_lines(tablebase):
+    def lines():
+        for _ in range(1000):
+            yield "5 1 9 3 2 8 7 4 6\n"
+        yield "5 5\n"
+
+    summary = analyze_log(tablebase, lines())
+    assert summary.games == 1000
+    assert summary.invalid == 1
+    assert summary.moves == 9000
+    assert summary.mistakes_per_move == 0.0
+    assert summary.to_dict()["results"] == {"DRAW": 1000}
@@ -0,0 +1,82 @@
+import pytest
+
+from game_stats import GameTreeStats
+from lazy import LazyNode, LazySolver
+from main import build_tree
+from mnk import MNKGame
+from node import GameState, Node
+
+
+@pytest.fixture(scope="module")
+def root() -> Node:
+    return build_tree()
+
+
+def test_full_tree_counts(root):
+    stats = GameTreeStats()
+    counts = stats.path_counts(root)
+
+    assert counts.games == 255_168
+    assert counts.outcomes == {
+        GameState.SIDE1_WIN: 131_184,
+        GameState.SIDE2_WIN: 77_904,
+        GameState.DRAW: 46_080,
+    }
+    assert counts.games_by_length[5] == {GameState.SIDE1_WIN: 1_440}
+    assert counts.games_by_length[6] == {GameState.SIDE2_WIN: 5_328}
+    assert counts.games_by_length[9] == {
+        GameState.SIDE1_WIN: 81_792,
+        GameState.DRAW: 46_080,
+    }
+    assert counts.optimal_lines == 3_584
+    # One entry per stored position, not per game
+    assert len(stats.counts) == 765
+
+
+def test_positions_by_ply(root):
+    positions = GameTreeStats().positions_by_ply(root)
+
+    assert positions == {
+        0: 1,
+        1: 9,
+        2: 72,
+        3: 252,
+        4: 756,
+        5: 1260,
+        6: 1520,
+        7: 1140,
+        8: 390,
+        9: 78,
+    }
+    with pytest.raises(ValueError):
+        GameTreeStats().positions_by_ply(root.children[0])
+
+
+def test_optimal_lines_follow_best_moves(root):
+    stats = GameTreeStats()
+    # Side 1 to move with two in a row on the top: only the winning move is optimal
+    node = root.child(0).child(3).child(1).child(4)
+    counts = stats.path_counts(node)
+
+    assert counts.optimal_lines == 1
+    assert counts.games == sum(
+        stats.path_counts(child).games for child in node.children
+    )
+
+
+def test_lazy_views_give_the_same_counts(root):
+    counts = GameTreeStats().path_counts(root)
+    game = MNKGame()
+    lazy = GameTreeStats(game).path_counts(LazyNode(LazySolver(game), 0, 0))
+
+    assert lazy == counts
+
+
+def test_other_board_sizes():
+    # Any two cells of a 2x2 board are in a line, so side 1 wins on its second move
+    game = MNKGame(2, 2, 2)
+    stats = GameTreeStats(game)
+    root = LazyNode(LazySolver(game), 0, 0)
+
+    assert stats.path_counts(root).games_by_length == {3: {GameState.SIDE1_WIN: 24}}
+    assert stats.positions_by_ply(root) == {0: 1, 1: 4, 2: 12, 3: 12}
@@ -0,0 +1,65 @@
+import pytest
+
+import main
+from instrumentation import STATS, SolverStats
+from node import Node
+
+
+def test_phase_times_accumulate_and_call_hooks():
+    stats = SolverStats()
+    seen: list[tuple[str, int]] = []
+
+    def hook(name: str, seconds: float, stats: SolverStats) -> None:
+        seen.append((name, stats.cache_hits))
+
+    stats.add_hook(hook)
+
+    with stats.phase("load"):
+        stats.cache_hits += 1
+    with stats.phase("load"):
+        pass
+    stats.remove_hook(hook)
+    with stats.phase("load"):
+        pass
+
+    assert seen == [("load", 1), ("load", 1)]
+    assert stats.phase_times["load"] >= 0
+    stats.reset()
+    assert stats.cache_hits == 0
+    assert stats.phase_times == {}
+
+
+def test_build_tree_records_solver_counters():
+    STATS.reset()
+    main.build_tree()
+
+    assert STATS.transposition_misses == len(Node.nodes) - 1
+    assert STATS.transposition_hits > 0
+    assert STATS.minimax_visits == len(Node.nodes)
+    assert STATS.minimax_calls > STATS.minimax_visits
+    assert 0 < STATS.evaluations < STATS.minimax_visits
+    assert set(STATS.phase_times) == {"expand", "solve"}
+
+
+def test_cache_functions_count_hits_misses_and_invalidations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    STATS.reset()
+
+    assert main.load_cached_tree() is None
+    main.cache_tree(main.build_tree())
+    assert main.load_cached_tree() is not None
+    (tmp_path / main.CACHE_FILE).write_bytes(b"not a pickle")
+    assert main.load_cached_tree() is None
+
+    assert (STATS.cache_misses, STATS.cache_hits, STATS.cache_invalidations) == (
+        1,
+        1,
+        1,
+    )
+    assert "cache_write" in STATS.phase_times
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    yield
+    STATS.reset()
@@ -0,0 +1,73 @@
+from time import perf_counter
+
+from compact_tree import CompactNode
+from lazy import LazyNode, LazySolver
+from mnk import MNKGame
+from node import GameState
+
+
+def test_lazy_values_match_full_solve(tree):
+    solver = LazySolver()
+    for node_id in range(len(tree)):
+        node = CompactNode(tree, node_id)
+        view = LazyNode(solver, node.key & 0x1FF, node.key >> 9)
+        assert view.minimax_value == node.minimax_value
+        assert view.state == node.state
+
+
+def test_lazy_best_moves_match_full_solve(tree):
+    solver = LazySolver()
+    for node_id in range(0, len(tree), 7):
+        node = CompactNode(tree, node_id)
+        view = LazyNode(solver, node.key & 0x1FF, node.key >> 9)
+        assert {child.key for child in view.get_best_moves()} == {
+            child.key for child in node.get_best_moves()
+        }
+
+
+def test_lazy_solver_only_solves_what_is_asked():
+    solver = LazySolver()
+    # Side 1 has two in a row with the third cell open: one move wins
+    node = LazyNode(solver, 0b000_000_011, 0b000_011_000)
+    assert node.minimax_value == 100 - 5
+    assert len(solver) < 10
+
+
+def test_lazy_solver_memoizes_across_games():
+    solver = LazySolver()
+    solver.root.get_best_moves()
+    misses = solver.misses
+    solver.root.get_best_moves()
+    assert solver.misses == misses
+    assert solver.hits > 0
+
+
+def test_lazy_solver_evicts_under_memory_cap():
+    solver = LazySolver(max_entries=50)
+    root = solver.root
+    assert root.minimax_value == 0
+    assert len(solver) <= 50
+    assert solver.evictions > 0
+    # Evicted positions are solved again on demand
+    node = root
+    while node.state == GameState.IN_PROGRESS:
+        node = node.get_best_moves()[0]
+    assert node.state == GameState.DRAW
+
+
+def test_lazy_solver_plays_other_boards():
+    solver = LazySolver(MNKGame(2, 2, 2))
+    assert solver.root.minimax_value == 100 - 3
+    assert len(solver.root.children) == 4
+
+
+def test_lazy_solver_answers_quickly_on_4x4():
+    solver = LazySolver(MNKGame(4, 4, 4))
+    start = perf_counter()
+    node = solver.root.child(5).child(10).child(0)
+    # 4x4 with four in a row is a draw
+    assert node.minimax_value == 0
+    assert node.get_best_moves()
+    assert solver.root.minimax_value == 0
+    # About a second on a laptop; the exhaustive search took minutes
+    assert perf_counter() - start < 15
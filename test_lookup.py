@@ -0,0 +1,51 @@
+import pytest
+
+from lookup import PerfectPlayTable, board_index
+from main import build_tree
+from node import position_id, to_bits
+
+
+@pytest.fixture(scope="module")
+def table() -> PerfectPlayTable:
+    return PerfectPlayTable.from_tree(build_tree())
+
+
+def test_board_index_accepts_every_board_form():
+    position = (
+        (1, 0, 0),
+        (0, 2, 0),
+        (0, 0, 1),
+    )
+    side1, side2 = to_bits(position)
+    expected = position_id(side1, side2)
+
+    assert board_index(position) == expected
+    assert board_index((side1, side2)) == expected
+    assert board_index(side1 | side2 << 9) == expected
+    assert board_index("100020001") == expected
+    assert board_index("1..|.2.|..1") == expected
+    assert board_index("1  \n 2 \n  1") == expected
+
+
+def test_board_index_rejects_bad_strings():
+    with pytest.raises(ValueError):
+        board_index("12")
+    with pytest.raises(ValueError):
+        board_index("XO.......")
+
+
+def test_probe_returns_value_and_best_moves(table):
+    assert table.probe("." * 9) == (0, frozenset(range(1, 10)))
+    # Side 1 completes the top row with cell 3
+    value, best_moves = table.probe("11.22....")
+    assert value == 100 - 5
+    assert best_moves == {3}
+    with pytest.raises(KeyError):
+        table.probe("222......")
+
+
+def test_table_root_matches_tree(table):
+    root = table.root
+    corner = root.child(0)
+    assert corner.minimax_value == 0
+    assert [move.key for move in corner.get_best_moves()] == [1 | 1 << (4 + 9)]
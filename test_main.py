@@ -0,0 +1,143 @@
+import argparse
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Event
+
+import pytest
+
+import main
+from instrumentation import STATS
+
+
+class FirstPrompt(Exception):
+    pass
+
+
+class BuildStopped(Exception):
+    pass
+
+
+def test_first_prompt_does_not_wait_for_engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["main.py", "--engine", "node", "--fresh"])
+    build_started = Event()
+    release_build = Event()
+    prompted_while_building: list[bool] = []
+
+    def blocked_build_tree(solver="minimax", progress=None):
+        build_started.set()
+        release_build.wait(timeout=10)
+        raise BuildStopped
+
+    def first_prompt(prompt=""):
+        build_started.wait(timeout=10)
+        prompted_while_building.append(not release_build.is_set())
+        raise FirstPrompt
+
+    monkeypatch.setattr(main, "build_tree", blocked_build_tree)
+    monkeypatch.setattr(main, "clear_stdin", lambda: None)
+    monkeypatch.setattr("builtins.input", first_prompt)
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        monkeypatch.setattr(main, "ThreadPoolExecutor", lambda max_workers: loader)
+        try:
+            with pytest.raises(FirstPrompt):
+                main.main()
+        finally:
+            release_build.set()
+    assert prompted_while_building == [True]
+
+
+def test_cold_start_asks_questions_before_reporting_the_build(tmp_path):
+    # A real launch on an empty cache directory, answered one prompt at a time
+    game = subprocess.Popen(
+        [sys.executable, "-u", "main.py", "--cache-dir", str(tmp_path)],
+        cwd=Path(main.__file__).parent,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    stdin, stdout = game.stdin, game.stdout
+    assert stdin is not None and stdout is not None
+    output = ""
+
+    def read_until(text: str) -> None:
+        nonlocal output
+        while text not in output:
+            character = stdout.read(1)
+            assert character, f"Game exited before {text!r}: {output!r}"
+            output += character
+
+    try:
+        for question, answer in (
+            ("Would you like to play as X?", "y"),
+            ("Would you like to go first?", "y"),
+            ("Show position evaluations?", "n"),
+        ):
+            read_until(question)
+            stdin.write(answer + "\n")
+            stdin.flush()
+        read_until("Your turn!")
+    finally:
+        game.kill()
+        game.wait()
+        stdin.close()
+        stdout.close()
+    assert output.index("Would you like to play as X?") < output.index(
+        "Built tablebase"
+    )
+    assert (tmp_path / main.TABLEBASE_FILE).exists()
+
+
+def test_cache_written_by_one_version_is_rejected_by_another(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main.cache_tree(main.build_tree())
+    assert main.load_cached_tree() is not None
+    monkeypatch.setattr(main, "ENGINE_VERSION", main.ENGINE_VERSION + 1)
+    messages: list[str] = []
+    assert main.load_cached_tree(messages.append) is None
+    assert messages == ["⚠️  Engine version changed, rebuilding cache..."]
+
+
+def test_build_tree_reports_progress():
+    counts: list[int] = []
+    main.build_tree(progress=counts.append)
+    assert counts == list(range(2, 766))
+
+
+def test_stale_cache_is_reported_once(tmp_path, monkeypatch):
+    main.cache_tree(main.build_tree(), tmp_path)
+    monkeypatch.setattr(main, "ENGINE_VERSION", main.ENGINE_VERSION + 1)
+    args = argparse.Namespace(
+        engine="node", size=None, fresh=False, cache_dir=tmp_path, solver="minimax"
+    )
+    messages: list[str] = []
+    STATS.reset()
+    main.load_engine(args, messages.append)
+    assert messages.count("⚠️  Engine version changed, rebuilding cache...") == 1
+    assert STATS.cache_invalidations == 1
+
+
+def test_board_size_is_checked_against_the_game_limits():
+    assert main.parse_board_size("4x4") == (4, 4, 4)
+    assert main.parse_board_size("5x5x4") == (5, 5, 4)
+    for value in ("9x9", "3x3x5", "0x3", "3by3"):
+        with pytest.raises(argparse.ArgumentTypeError):
+            main.parse_board_size(value)
+
+
+def test_prompt_counts_cells_of_larger_boards(monkeypatch, capsys):
+    from lazy import LazySolver
+    from mnk import MNKGame
+
+    node = LazySolver(MNKGame(4, 4, 3)).root.child(5)
+    monkeypatch.setattr(main, "clear_stdin", lambda: None)
+    answers = iter(["17", "6", "16"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+
+    assert main.prompt_user_move(node, show_eval=False) == 15
+    out = capsys.readouterr().out
+    assert "(1-16)" in out
+    assert "Cell number must be between 1 and 16." in out
+    assert "That cell is already occupied." in out
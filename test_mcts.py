@@ -0,0 +1,63 @@
+import pytest
+
+from compact_tree import CompactTree
+from mcts import MCTSEngine, MCTSNode
+from mnk import MNKGame
+from node import GameState, to_bits
+
+
+def engine(playouts: int = 2000) -> MCTSEngine:
+    return MCTSEngine(MNKGame(), time_limit=None, playout_limit=playouts, seed=0)
+
+
+def test_mcts_needs_a_budget():
+    with pytest.raises(ValueError):
+        MCTSEngine(time_limit=None, playout_limit=None)
+
+
+def test_mcts_takes_a_win():
+    side1, side2 = to_bits(((1, 1, 0), (2, 2, 0), (0, 0, 0)))
+    assert engine().analyze(side1, side2).best_moves() == [2]
+
+
+def test_mcts_blocks_a_loss():
+    side1, side2 = to_bits(((1, 0, 0), (2, 2, 0), (1, 0, 0)))
+    best = MCTSNode(engine(), side1, side2).get_best_moves()
+    assert [child.side1 for child in best] == [side1 | 1 << 5]
+
+
+def test_mcts_respects_playout_budget():
+    result = engine(playouts=500).analyze(0, 0)
+    assert result.playouts == 500
+    assert sum(result.move_visits.values()) == 500
+    assert result.playouts_per_second > 0
+
+
+def test_mcts_respects_time_budget():
+    timed = MCTSEngine(MNKGame(5, 5, 4), time_limit=0.05, seed=0)
+    result = timed.analyze(0, 0)
+    assert result.playouts > 0
+    assert result.elapsed < 0.5
+
+
+def test_mcts_reuses_tree_after_opponent_reply():
+    search = engine(playouts=1000)
+    first = search.analyze(0, 0)
+    assert not first.reused
+    move = first.best_moves()[0]
+    reply = next(cell for cell in range(9) if cell != move)
+    second = search.analyze(1 << move, 1 << reply)
+    assert second.reused
+
+
+def test_mcts_agrees_with_perfect_solver():
+    tree = CompactTree.build()
+    search = engine(playouts=3000)
+    # Every position two plies in, where a single mistake can cost the game
+    for child in tree.root.children:
+        for position in child.children:
+            if position.state != GameState.IN_PROGRESS:
+                continue
+            perfect = {move.key for move in position.get_best_moves()}
+            node = MCTSNode(search, position.side1, position.side2)
+            assert node.get_best_moves()[0].key in perfect
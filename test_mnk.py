@@ -0,0 +1,111 @@
+import pytest
+
+from main import build_tree
+from mnk import (
+    ENTRY_BYTES,
+    EXACT,
+    MNKEngine,
+    MNKGame,
+    MNKNode,
+    TranspositionTable,
+)
+from node import WIN_SCORE, GameState
+
+
+def test_mnk_game_lines():
+    assert len(MNKGame(3, 3, 3).lines) == 8
+    # 4 rows + 4 columns + 2 diagonals
+    assert len(MNKGame(4, 4, 4).lines) == 10
+    # 5 * 2 rows + 5 * 2 columns + 2 * 2 * 2 diagonals
+    assert len(MNKGame(5, 5, 4).lines) == 28
+    with pytest.raises(ValueError):
+        MNKGame(3, 3, 4)
+
+
+def test_engine_matches_node_tree_on_3x3():
+    root = build_tree()
+    engine = MNKEngine(MNKGame(), time_limit=None)
+    pending = [root]
+    seen: set[int] = set()
+    while pending:
+        node = pending.pop()
+        if node.key in seen or len(seen) > 300:
+            continue
+        seen.add(node.key)
+        pending.extend(node.children)
+        if node.state == GameState.IN_PROGRESS:
+            view = MNKNode(engine, node.side1, node.side2)
+            assert view.analysis.complete
+            assert view.minimax_value == node.minimax_value
+            assert {move.key for move in view.get_best_moves()} == {
+                move.key for move in node.get_best_moves()
+            }
+
+
+def test_engine_finds_immediate_win_on_large_board():
+    game = MNKGame(5, 5, 4)
+    engine = MNKEngine(game, time_limit=None, node_limit=5_000)
+    # Side 1 holds three of the top row and is to move
+    side1 = 0b0111
+    side2 = 1 << 10 | 1 << 15 | 1 << 20
+    view = MNKNode(engine, side1, side2)
+
+    best = view.get_best_moves()
+    assert [move.move for move in best] == [3]
+    assert view.minimax_value == WIN_SCORE - 7
+
+
+def test_engine_respects_node_budget():
+    engine = MNKEngine(MNKGame(5, 5, 4), time_limit=None, node_limit=2_000)
+    result = engine.analyze(0, 0)
+
+    assert not result.complete
+    assert result.depth >= 1
+    assert len(result.move_values) == 25
+    # Only the first iteration may exceed the budget
+    assert result.nodes < 2_000 + 25 * 25
+
+
+def test_transposition_table_capacity_and_replacement():
+    table = TranspositionTable(max_bytes=ENTRY_BYTES * 4)
+    assert table.capacity == 4
+
+    table.new_search()
+    table.store(1, 5, 10, EXACT, 0)
+    # A shallower result from the same search does not evict a deeper one
+    table.store(5, 2, 20, EXACT, 0)
+    assert table.get(1) is not None
+    assert table.get(5) is None
+    # Results from a later search always replace
+    table.new_search()
+    table.store(5, 2, 20, EXACT, 0)
+    assert table.get(5) is not None
+    assert table.get(1) is None
+    assert len(table) == 1
+
+
+def test_zobrist_hash_updates_with_one_xor_per_move():
+    game = MNKGame(7, 7, 5)
+    mine = theirs = 0
+    zobrist = swapped = 0
+    for cell in (24, 0, 48, 17, 30, 6):
+        mine |= 1 << cell
+        # The opponent moves next, so the pieces and the two hashes trade places
+        mine, theirs = theirs, mine
+        zobrist, swapped = (
+            swapped ^ game.zobrist[1][cell],
+            zobrist ^ game.zobrist[0][cell],
+        )
+        assert zobrist == game.zobrist_hash(mine, theirs)
+        assert swapped == game.zobrist_hash(theirs, mine)
+    assert MNKGame(7, 7, 5).zobrist == game.zobrist
+
+
+def test_transposition_table_checks_zobrist_collisions():
+    table = TranspositionTable(max_bytes=ENTRY_BYTES * 4)
+    table.store(1, 5, 10, EXACT, 0, zobrist=3)
+    # Same slot, different position
+    assert table.get(2, zobrist=3) is None
+    entry = table.get(1, zobrist=3)
+    assert entry is not None
+    assert entry[3] == 10
@@ -1,6 +1,18 @@
+from collections import Counter
+
 import pytest
 
-from node import DRAW_SCORE, WIN_SCORE, GameState, Node
+from instrumentation import STATS
+from node import (
+    DRAW_SCORE,
+    WIN_SCORE,
+    GameState,
+    Node,
+    canonical_key,
+    state_of,
+    to_bits,
+    to_position,
+)
 
 EMPTY_POSITION = (
     (0, 0, 0),
@@ -157,3 +169,148 @@ def test_get_best_moves_requires_minimax_values():
 
     with pytest.raises(TypeError):
         parent.get_best_moves()
+
+
+def test_set_minimax_recursively_solves_each_position_once():
+    STATS.reset()
+    root = Node(side_to_move=1, position=EMPTY_POSITION)
+    Node.nodes[canonical_key(root.side1, root.side2)] = root
+    root.create_children_recursively()
+
+    assert root.set_minimax_recursively() == DRAW_SCORE
+    assert STATS.minimax_visits == len(Node.nodes)
+    assert STATS.transposition_misses == len(Node.nodes) - 1
+    assert all(node.minimax_value is not None for node in Node.nodes.values())
+
+
+def test_bitboard_round_trip():
+    position = (
+        (1, 2, 0),
+        (0, 1, 2),
+        (2, 0, 1),
+    )
+    side1, side2 = to_bits(position)
+
+    assert side1 == 0b100_010_001
+    assert side2 == 0b001_100_010
+    assert to_position(side1, side2) == position
+    assert state_of(side1, side2) == GameState.SIDE1_WIN
+
+
+def test_from_bits_matches_tuple_constructor():
+    position = (
+        (1, 0, 0),
+        (0, 2, 0),
+        (0, 0, 0),
+    )
+    node = Node.from_bits(1, *to_bits(position))
+
+    assert node.position == position
+    assert node.state == Node(side_to_move=1, position=position).state
+    assert node.key == to_bits(position)[0] | to_bits(position)[1] << 9
+
+
+def test_canonical_key_is_shared_by_symmetric_positions():
+    corner = to_bits(((1, 0, 0), (0, 0, 0), (0, 0, 0)))
+    other_corner = to_bits(((0, 0, 0), (0, 0, 0), (0, 0, 1)))
+    edge = to_bits(((0, 1, 0), (0, 0, 0), (0, 0, 0)))
+
+    assert canonical_key(*corner) == canonical_key(*other_corner)
+    assert canonical_key(*corner) != canonical_key(*edge)
+
+
+def test_symmetric_children_keep_real_orientation():
+    root = Node(side_to_move=1, position=EMPTY_POSITION)
+    Node.nodes[canonical_key(root.side1, root.side2)] = root
+    root.create_children_recursively()
+    root.set_minimax_recursively()
+
+    # Only the corner, edge and centre openings are stored
+    assert len({child.canonical for child in root.children}) == 3
+    for i in range(3):
+        for j in range(3):
+            position = Node.position_with_move(EMPTY_POSITION, i, j, 1)
+            (child,) = [c for c in root.children if c.position == position]
+            replies = {reply.position for reply in child.children}
+            assert len(replies) == 8
+            assert all(
+                Node.position_with_move(position, r, c, 2) in replies
+                for r in range(3)
+                for c in range(3)
+                if position[r][c] == 0
+            )
+            assert all(reply.minimax_value is not None for reply in child.children)
+
+
+def test_moves_index_children_by_cell():
+    root = Node.from_bits(side_to_move=1, side1=0, side2=0)
+    Node.nodes[canonical_key(0, 0)] = root
+    root.create_children_recursively()
+    assert sorted(root.moves) == list(range(9))
+    for cell, child in root.moves.items():
+        assert child.side1 == 1 << cell
+        assert root.child(cell) is child
+    # Symmetric views expose their own orientation's cells
+    corner = root.child(8)
+    reply = corner.child(0)
+    assert (reply.side1, reply.side2) == (1 << 8, 1 << 0)
+    assert sorted(corner.moves) == list(range(8))
+
+
+def test_expand_yields_each_stored_position_once():
+    root = Node.from_bits(side_to_move=1, side1=0, side2=0)
+    Node.nodes[canonical_key(0, 0)] = root
+    expanded = list(root.expand())
+
+    assert len(expanded) == len(Node.nodes) - 1 == 764
+    assert len({id(node) for node in expanded}) == len(expanded)
+    assert all(
+        node is Node.nodes[canonical_key(node.side1, node.side2)] for node in expanded
+    )
+
+
+def test_expand_stops_at_max_depth_or_when_the_caller_stops():
+    root = Node.from_bits(side_to_move=1, side1=0, side2=0)
+    Node.nodes[canonical_key(0, 0)] = root
+    plies = Counter((node.side1 | node.side2).bit_count() for node in root.expand(2))
+    # Corner, edge and centre openings, then 5, 5 and 2 distinct replies
+    assert plies == {1: 3, 2: 12}
+    assert all(not child.children for child in root.children[0].children)
+
+    Node.nodes.clear()
+    Node.nodes[canonical_key(0, 0)] = root
+    root.children = []
+    for count, _ in enumerate(root.expand(), 1):
+        if count == 10:
+            break
+    assert len(Node.nodes) == 11
+
+
+def test_walking_every_position_creates_one_object_per_board():
+    root = Node.from_bits(side_to_move=1, side1=0, side2=0)
+    Node.nodes[canonical_key(0, 0)] = root
+    root.create_children_recursively()
+    root.set_minimax_recursively()
+
+    def walk() -> dict[int, Node]:
+        reached: dict[int, Node] = {}
+        pending = [root]
+        while pending:
+            node = pending.pop()
+            if id(node) not in reached:
+                reached[id(node)] = node
+                pending.extend(node.children)
+        return reached
+
+    reached = walk()
+    created = STATS.nodes_created
+    # Walking again reuses the same views instead of building new ones
+    assert len(walk()) == len(reached) == 5478
+    assert STATS.nodes_created == created
+    assert len({node.key for node in reached.values()}) == 5478
+    # Views read their value from the stored node, so it is never stale
+    for node in Node.nodes.values():
+        node.minimax_value = None
+    assert all(node.minimax_value is None for node in reached.values())
+    root.set_minimax_recursively()
+    assert all(node.minimax_value is not None for node in reached.values())
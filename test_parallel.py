@@ -0,0 +1,30 @@
+import pytest
+
+from compact_tree import CompactTree
+from mnk import MNKGame
+from parallel import frontier, parallel_solve, solve_subtree
+
+
+def test_frontier_keeps_one_position_per_symmetry_class():
+    game = MNKGame()
+    assert len(frontier(game, 0)) == 1
+    # Corner, edge and centre openings
+    assert len(frontier(game, 1)) == 3
+    assert len(frontier(game, 2)) == 12
+
+
+@pytest.mark.parametrize("split_depth", [1, 2])
+def test_parallel_solve_matches_serial_solve(split_depth):
+    game = MNKGame()
+    tree = CompactTree.build()
+    expected = {key: tree.values[node_id] for node_id, key in enumerate(tree.keys)}
+
+    values = parallel_solve(game, workers=2, split_depth=split_depth)
+
+    assert values[0] == 0
+    assert values == {key: expected[key] for key in values}
+
+
+def test_solve_subtree_covers_every_reachable_position():
+    tree = CompactTree.build()
+    assert len(solve_subtree(MNKGame(), 0, 0)) == len(tree)
@@ -0,0 +1,44 @@
+import pytest
+
+from compact_tree import CompactTree
+from main import build_tree
+from node import FULL_BOARD, Node, position_id
+from retrograde import retrograde_solve
+
+
+def test_retrograde_matches_recursive_minimax():
+    values = retrograde_solve()
+    build_tree("minimax")
+    for node in Node.nodes.values():
+        assert values[position_id(node.side1, node.side2)] == node.minimax_value
+
+
+def test_retrograde_matches_every_reachable_position():
+    values = retrograde_solve()
+    tree = CompactTree.build()
+    for node_id, key in enumerate(tree.keys):
+        board_id = position_id(key & FULL_BOARD, key >> 9)
+        assert values[board_id] == tree.values[node_id]
+
+
+def test_build_tree_with_retrograde_solver_matches_minimax():
+    minimax_root = build_tree("minimax")
+    retrograde_root = build_tree("retrograde")
+    pending = [(minimax_root, retrograde_root)]
+    seen: set[int] = set()
+    while pending:
+        expected, actual = pending.pop()
+        if actual.key in seen:
+            continue
+        seen.add(actual.key)
+        assert actual.minimax_value == expected.minimax_value
+        assert {child.key for child in actual.get_best_moves()} == {
+            child.key for child in expected.get_best_moves()
+        }
+        pending.extend(zip(expected.children, actual.children))
+    assert len(seen) == 5478
+
+
+def test_build_tree_rejects_unknown_solver():
+    with pytest.raises(ValueError):
+        build_tree("alphabeta")
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from lookup import PerfectPlayTable
+from server import GameServer, Session, run_load
+from tablebase import TablebaseNode
+
+
+@pytest.fixture(scope="module")
+def table(tree) -> PerfectPlayTable:
+    return PerfectPlayTable.from_tree(tree.root)
+
+
+def test_handle_request_plays_and_validates(table):
+    server = GameServer(table, seed=0)
+    session = Session(TablebaseNode(table, 0, 0))
+
+    response = server.handle_request(session, {"op": "new"})
+    assert response["board"] == "0" * 9
+    assert response["value"] == 0
+    # JSON true is not cell 1
+    response = server.handle_request(session, {"op": "move", "cell": True})
+    assert response == {"error": "Cell number must be between 1 and 9."}
+
+    response = server.handle_request(session, {"op": "move", "cell": 1})
+    # The computer answers a corner opening in the centre
+    assert response["board"][0] == "1"
+    assert response["board"][4] == "2"
+    assert response["side_to_move"] == 1
+
+    assert "error" in server.handle_request(session, {"op": "move", "cell": 1})
+    assert "error" in server.handle_request(session, {"op": "move", "cell": 10})
+    assert "error" in server.handle_request(session, {"op": "jump"})
+    assert set(server.handle_request(session, {"op": "eval"})["moves"]) == {
+        "2",
+        "3",
+        "4",
+        "6",
+        "7",
+        "8",
+        "9",
+    }
+
+
+def test_server_handles_concurrent_sessions(table):
+    async def scenario() -> dict:
+        game_server = GameServer(table, seed=0)
+        server = await game_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            report = await run_load("127.0.0.1", port, 200, 50, seed=0)
+        assert game_server.games_started == 200
+        return report
+
+    report = asyncio.run(scenario())
+
+    assert report["sessions"] == 200
+    assert report["requests"] >= 200 * 3
+    assert report["sessions_per_second"] > 0
@@ -0,0 +1,47 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from node import FULL_BOARD
+from shared_tablebase import SharedTablebase, attach_worker, play_random_games
+
+
+@pytest.fixture
+def published(tree):
+    with SharedTablebase.publish(tree=tree) as table:
+        yield table
+
+
+def test_attached_table_matches_tree(tree, published):
+    with SharedTablebase.attach(published.name) as attached:
+        for node_id, key in enumerate(tree.keys):
+            value, _ = attached.lookup(key & FULL_BOARD, key >> 9)
+            assert value == tree.values[node_id]
+        assert attached.root.minimax_value == 0
+        assert len(attached.root.get_best_moves()) == 9
+
+
+def test_attached_table_is_read_only(published):
+    with SharedTablebase.attach(published.name) as attached:
+        with pytest.raises(TypeError):
+            attached._buffer[0] = 0
+
+
+def test_publisher_unlinks_on_close(tree):
+    table = SharedTablebase.publish(tree=tree)
+    name = table.name
+    table.close()
+    with pytest.raises(FileNotFoundError):
+        SharedTablebase.attach(name)
+
+
+def test_spawned_workers_play_from_shared_table(published):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        2, mp_context=context, initializer=attach_worker, initargs=(published.name,)
+    ) as executor:
+        results = list(executor.map(play_random_games, [50, 50], [0, 1]))
+    for outcomes, _ in results:
+        assert outcomes["random"] == 0
+        assert sum(outcomes.values()) == 50
@@ -0,0 +1,68 @@
+import pytest
+
+import tablebase as tablebase_module
+from compact_tree import CompactNode
+from node import ENGINE_VERSION, position_id, to_bits
+from tablebase import (
+    HEADER,
+    Tablebase,
+    TablebaseNode,
+    load_tablebase,
+    write_tablebase,
+)
+
+
+def test_position_id_is_base3():
+    position = (
+        (1, 2, 0),
+        (0, 0, 0),
+        (0, 0, 2),
+    )
+    assert position_id(*to_bits(position)) == 1 + 2 * 3 + 2 * 3**8
+    assert position_id(0, 0) == 0
+
+
+def test_tablebase_matches_compact_tree(tree, tablebase):
+    for node_id in range(len(tree)):
+        node = CompactNode(tree, node_id)
+        view = TablebaseNode(tablebase, node.side1, node.side2)
+        assert view.minimax_value == node.minimax_value
+        assert view.side_to_move == node.side_to_move
+        assert {child.key for child in view.get_best_moves()} == {
+            child.key for child in node.get_best_moves()
+        }
+
+
+def test_tablebase_rejects_unreachable_position(tablebase):
+    # Side 2 cannot have more pieces than side 1
+    with pytest.raises(KeyError):
+        tablebase.lookup(0, 0b11)
+
+
+def test_tablebase_rejects_bad_files(tmp_path):
+    truncated = tmp_path / "truncated.bin"
+    write_tablebase(truncated)
+    truncated.write_bytes(truncated.read_bytes()[: HEADER.size + 10])
+    with pytest.raises(ValueError):
+        Tablebase(truncated)
+
+    wrong_magic = tmp_path / "wrong.bin"
+    wrong_magic.write_bytes(b"NOPE" + bytes(100))
+    with pytest.raises(ValueError):
+        Tablebase(wrong_magic)
+
+
+def test_tablebase_rejects_other_engine_version(tmp_path, monkeypatch):
+    path = tmp_path / "tablebase.bin"
+    write_tablebase(path)
+    monkeypatch.setattr(tablebase_module, "ENGINE_VERSION", ENGINE_VERSION + 1)
+    with pytest.raises(ValueError):
+        Tablebase(path)
+    assert load_tablebase(path, log=lambda message: None) is None
+
+
+def test_tablebase_root_plays_like_node(tablebase):
+    root = tablebase.root
+    assert root.minimax_value == 0
+    assert len(root.children) == 9
+    assert len(root.get_best_moves()) == 9